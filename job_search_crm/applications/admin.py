@@ -1,25 +1,141 @@
-from django.contrib import admin
-from .models import (Application, Company, CustomerProfile, Event, Position)
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.shortcuts import render
 
+from .forms import NewEventForm
+from .pagination import EstimatedCountPaginator
+from .models import (
+    Application,
+    ApplicationStatus,
+    Company,
+    CustomerProfile,
+    Event,
+    InvalidTransition,
+    Position,
+    STATUS_TRANSITIONS,
+    Tag,
+)
 
-class ApplicationAdmin(admin.ModelAdmin):
-    pass
 
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables with millions of rows.
 
-class CompanyAdmin(admin.ModelAdmin):
-    pass
+    Search only uses exact matches on indexed columns, the unfiltered count
+    comes from the planner's estimate and the second, unfiltered COUNT(*)
+    for "N of M selected" is skipped.
+    """
 
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-class CustomerProfileAdmin(admin.ModelAdmin):
-    pass
 
+def transition_action(status):
+    @admin.action(description="Mark selected applications as {}".format(status.label))
+    def action(modeladmin, request, queryset):
+        try:
+            count = queryset.transition(status)
+        except InvalidTransition as e:
+            modeladmin.message_user(request, str(e), messages.ERROR)
+        else:
+            modeladmin.message_user(
+                request, "Marked {} applications as {}.".format(count, status.label)
+            )
 
-class EventAdmin(admin.ModelAdmin):
-    pass
+    action.__name__ = "mark_{}".format(status.name.lower())
+    return action
 
 
-class PositionAdmin(admin.ModelAdmin):
-    pass
+class ApplicationAdmin(LargeTableAdmin):
+    list_display = ("__str__", "applicant", "status", "start_date", "end_date")
+    list_filter = ("status",)
+    list_select_related = ("position__company", "applicant__user")
+    autocomplete_fields = ("applicant", "position")
+    date_hierarchy = "start_date"
+    search_fields = (
+        "applicant__user__username__exact",
+        "position__company__company_name__exact",
+        "position__position_name__exact",
+    )
+    search_help_text = (
+        "Exact username, company name or position name; quote names with spaces, "
+        'as in "Acme, Inc.".'
+    )
+    actions = [
+        transition_action(status)
+        for status in ApplicationStatus
+        if any(status in targets for targets in STATUS_TRANSITIONS.values())
+    ] + ["add_event"]
+
+    @admin.action(description="Add an event to selected applications")
+    def add_event(self, request, queryset):
+        form = NewEventForm(request.POST if "apply" in request.POST else None)
+        if form.is_valid():
+            count = queryset.add_event(
+                form.cleaned_data["description"], form.cleaned_data["date"]
+            )
+            self.message_user(request, "Added {} events.".format(count))
+            return None
+
+        return render(
+            request,
+            "admin/applications/application/add_event.html",
+            dict(
+                self.admin_site.each_context(request),
+                title="Add an event",
+                opts=self.model._meta,
+                form=form,
+                action_checkbox_name=helpers.ACTION_CHECKBOX_NAME,
+                selected=request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+                select_across=request.POST.get("select_across", "0"),
+            ),
+        )
+
+    def delete_queryset(self, request, queryset):
+        queryset.bulk_delete()
+
+
+class CompanyAdmin(LargeTableAdmin):
+    list_display = ("company_name", "location", "sub_industry")
+    search_fields = ("company_name__exact",)
+    search_help_text = "Exact company name; quote names with spaces."
+
+
+class CustomerProfileAdmin(LargeTableAdmin):
+    list_display = ("__str__", "user", "location")
+    list_select_related = ("user",)
+    search_fields = ("user__username__exact",)
+    search_help_text = "Exact username."
+
+    def get_queryset(self, request):
+        # __str__ reads the user, also in autocomplete results.
+        return super().get_queryset(request).select_related("user")
+
+
+class EventAdmin(LargeTableAdmin):
+    list_display = ("description", "application", "date")
+    list_filter = ("date",)
+    list_select_related = ("application__position__company",)
+    raw_id_fields = ("application",)
+    date_hierarchy = "date"
+
+    def delete_queryset(self, request, queryset):
+        queryset.bulk_delete()
+
+
+class PositionAdmin(LargeTableAdmin):
+    list_display = ("position_name", "company", "is_remote", "min_salary", "max_salary")
+    list_select_related = ("company",)
+    autocomplete_fields = ("company", "tags")
+    search_fields = ("position_name__exact", "company__company_name__exact")
+    search_help_text = "Exact position or company name; quote names with spaces."
+
+    def get_queryset(self, request):
+        # __str__ reads the company, also in autocomplete results.
+        return super().get_queryset(request).select_related("company")
+
+
+class TagAdmin(admin.ModelAdmin):
+    search_fields = ("name__exact",)
 
 
 admin.site.register(Application, ApplicationAdmin)
@@ -27,3 +143,4 @@ admin.site.register(Company, CompanyAdmin)
 admin.site.register(CustomerProfile, CustomerProfileAdmin)
 admin.site.register(Event, EventAdmin)
 admin.site.register(Position, PositionAdmin)
+admin.site.register(Tag, TagAdmin)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ApplicationsConfig(AppConfig):
     name = "applications"
+
+    def ready(self):
+        from . import db  # noqa: F401 registers the connection_created receiver
@@ -0,0 +1,175 @@
+"""Per-user cache of rendered page fragments.
+
+Every user has a version token; fragment keys include it, so replacing the
+token (see `invalidate`) orphans all of that user's cached fragments at once
+and they simply expire. Tokens are replaced by the model signal receivers in
+models.py and by the bulk code paths that bypass signals.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = "crm"
+STATS = {"hit": "hits", "miss": "misses"}
+# Seconds between additions of a process's hit and miss counts to the cache.
+FLUSH_INTERVAL = 10
+
+
+def version_key(user_id):
+    return "{}:version:{}".format(KEY_PREFIX, user_id)
+
+
+def user_version(user_id):
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate(user_ids):
+    """Drop every cached fragment of the given users."""
+    cache.set_many(
+        {version_key(user_id): uuid.uuid4().hex for user_id in set(user_ids)}, None
+    )
+
+
+async def auser_version(user_id):
+    key = version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not await cache.aadd(key, version, None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def versioned_key(user_id, version, name, parts):
+    # Parts may come from the query string; hash them into a safe key.
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return ":".join(str(part) for part in (KEY_PREFIX, name, user_id, version, digest))
+
+
+def fragment_key(user_id, name, *parts):
+    return versioned_key(user_id, user_version(user_id), name, parts)
+
+
+def cached_fragment(user_id, name, render, *parts):
+    """Return the fragment `name` for the user, calling `render` on a miss.
+
+    Exceptions raised by `render` propagate and nothing is cached.
+    """
+    started = time.perf_counter()
+    key = fragment_key(user_id, name, *parts)
+    fragment = cache.get(key)
+    if fragment is not None:
+        record("hit", time.perf_counter() - started)
+        return fragment
+
+    fragment = render()
+    cache.set(key, fragment, settings.FRAGMENT_CACHE_TIMEOUT)
+    record("miss", time.perf_counter() - started)
+    return fragment
+
+
+async def acached_fragment(user_id, name, render, *parts):
+    """cached_fragment for async views, where `render` is a coroutine function."""
+    started = time.perf_counter()
+    key = versioned_key(user_id, await auser_version(user_id), name, parts)
+    fragment = await cache.aget(key)
+    if fragment is not None:
+        await arecord("hit", time.perf_counter() - started)
+        return fragment
+
+    fragment = await render()
+    await cache.aset(key, fragment, settings.FRAGMENT_CACHE_TIMEOUT)
+    await arecord("miss", time.perf_counter() - started)
+    return fragment
+
+
+def stats_key(name):
+    return "{}:stats:{}".format(KEY_PREFIX, name)
+
+
+class Counts:
+    """Hit and miss counts of this process, added to the cache periodically.
+
+    Counting in memory keeps lookups from paying for cache writes, which on
+    the file-based cache also list its directory.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.flushed = time.monotonic()
+
+    def add(self, outcome, seconds):
+        """Count a lookup; return the counts due for flushing, or None."""
+        with self.lock:
+            self.pending[outcome] += 1
+            self.pending[outcome + "_us"] += int(seconds * 1000000)
+            if time.monotonic() - self.flushed < FLUSH_INTERVAL:
+                return None
+        return self.take()
+
+    def take(self):
+        """Return the counts not yet flushed and start over."""
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.flushed = time.monotonic()
+        return pending
+
+
+counts = Counts()
+
+
+def flush(pending):
+    for name, delta in pending.items():
+        try:
+            cache.incr(stats_key(name), delta)
+        except ValueError:
+            cache.set(stats_key(name), delta, None)
+
+
+async def aflush(pending):
+    for name, delta in pending.items():
+        try:
+            await cache.aincr(stats_key(name), delta)
+        except ValueError:
+            await cache.aset(stats_key(name), delta, None)
+
+
+def record(outcome, seconds):
+    pending = counts.add(outcome, seconds)
+    if pending:
+        flush(pending)
+
+
+async def arecord(outcome, seconds):
+    pending = counts.add(outcome, seconds)
+    if pending:
+        await aflush(pending)
+
+
+def stats():
+    """Hit rate and mean latency in milliseconds of hits and misses."""
+    flush(counts.take())
+    names = [name for outcome in STATS for name in (outcome, outcome + "_us")]
+    values = cache.get_many([stats_key(name) for name in names])
+    report = {}
+    for outcome, plural in STATS.items():
+        count = values.get(stats_key(outcome), 0)
+        total = values.get(stats_key(outcome + "_us"), 0)
+        report[plural] = count
+        report[outcome + "_ms"] = total / count / 1000 if count else None
+    lookups = report["hits"] + report["misses"]
+    report["hit_rate"] = report["hits"] / lookups if lookups else None
+    return report
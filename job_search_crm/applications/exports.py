@@ -0,0 +1,136 @@
+"""Streaming export of a customer's applications and their event timelines.
+
+Applications are read with a server-side cursor in chunks, each chunk
+prefetching its events with a single query, and every record is serialized
+as soon as it is read. aexport_applications does the same for async views,
+so a long export doesn't hold a worker thread. The CSV layout matches the
+import columns, so the applications of an export can be imported again;
+their events are not, and their extra rows count as duplicates.
+"""
+
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+
+from .models import Application
+
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+CHUNK_SIZE = 2000
+CSV_COLUMNS = (
+    "company_name",
+    "company_location",
+    "company_sub_industry",
+    "position_name",
+    "is_remote",
+    "min_salary",
+    "max_salary",
+    "tech_stack",
+    "start_date",
+    "end_date",
+    "status",
+    "event_date",
+    "event_description",
+)
+
+
+class Echo:
+    """A file-like object whose write() returns the data instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(profile):
+    return (
+        Application.objects.filter(applicant=profile)
+        .select_related("position__company")
+        .prefetch_related("event_set")
+        .order_by("id")
+    )
+
+
+def application_record(application):
+    position = application.position
+    company = position.company
+    return {
+        "company_name": company.company_name,
+        "company_location": company.location,
+        "company_sub_industry": company.sub_industry,
+        "position_name": position.position_name,
+        "is_remote": position.is_remote,
+        "min_salary": position.min_salary,
+        "max_salary": position.max_salary,
+        "tech_stack": position.tech_stack or "",
+        "start_date": application.start_date.isoformat(),
+        "end_date": application.end_date and application.end_date.isoformat(),
+        "status": application.get_status_display(),
+        "events": [
+            {"date": event.date.isoformat(), "description": event.description}
+            for event in application.event_set.all()
+        ],
+    }
+
+
+def csv_lines(writer, application):
+    record = application_record(application)
+    row = [record[column] for column in CSV_COLUMNS[:-2]]
+    for event in record["events"] or [{"date": "", "description": ""}]:
+        yield writer.writerow(row + [event["date"], event["description"]])
+
+
+def ndjson_line(application):
+    return json.dumps(application_record(application)) + "\n"
+
+
+def export_csv(applications):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for application in applications:
+        yield from csv_lines(writer, application)
+
+
+def export_ndjson(applications):
+    for application in applications:
+        yield ndjson_line(application)
+
+
+async def aexport_csv(applications):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    async for application in applications:
+        for line in csv_lines(writer, application):
+            yield line
+
+
+async def aexport_ndjson(applications):
+    async for application in applications:
+        yield ndjson_line(application)
+
+
+def export_applications(profile, format="csv", chunk_size=CHUNK_SIZE):
+    """Yield the serialized export of `profile`'s applications piece by piece."""
+    if format not in FORMATS:
+        raise ValueError("Unsupported export format: {}".format(format))
+
+    applications = export_queryset(profile)
+    # Pick the database while the request is being handled: the response is
+    # streamed after the request's replica routing has ended.
+    applications = applications.using(applications.db).iterator(chunk_size=chunk_size)
+    if format == "csv":
+        return export_csv(applications)
+    return export_ndjson(applications)
+
+
+async def aexport_applications(profile, format="csv", chunk_size=CHUNK_SIZE):
+    """export_applications for async views, returning an async iterator."""
+    if format not in FORMATS:
+        raise ValueError("Unsupported export format: {}".format(format))
+
+    applications = export_queryset(profile)
+    # Routing may connect to a replica, which can't be done from the event loop.
+    db = await sync_to_async(lambda: applications.db)()
+    applications = applications.using(db).aiterator(chunk_size=chunk_size)
+    if format == "csv":
+        return aexport_csv(applications)
+    return aexport_ndjson(applications)
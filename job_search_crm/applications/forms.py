@@ -1,6 +1,8 @@
 from django import forms
 from django.utils import timezone
 
+from .models import ApplicationStatus
+
 
 class NewApplicationForm(forms.Form):
     company_name = forms.CharField()
@@ -12,6 +14,10 @@ class NewApplicationForm(forms.Form):
     min_salary = forms.IntegerField()
     max_salary = forms.IntegerField()
     tech_stack = forms.CharField(widget=forms.Textarea)
+    tags = forms.CharField(
+        required=False,
+        help_text="Comma-separated, e.g. Python, Django. Defaults to the tech stack.",
+    )
 
     def is_valid(self):
         valid = super().is_valid()
@@ -21,11 +27,51 @@ class NewApplicationForm(forms.Form):
         return valid
 
 
+class ImportApplicationsForm(forms.Form):
+    file = forms.FileField()
+
+
 class NewEventForm(forms.Form):
     description = forms.CharField(widget=forms.Textarea)
     date = forms.DateField(initial=timezone.now)
 
 
+class ApplicationStatusForm(forms.Form):
+    status = forms.TypedChoiceField(choices=ApplicationStatus.choices, coerce=int)
+
+
+class IdsField(forms.TypedMultipleChoiceField):
+    """Any number of object ids, without a list of choices to check them against."""
+
+    def valid_value(self, value):
+        return True
+
+
+class BulkApplicationsForm(forms.Form):
+    ACTIONS = (
+        ("status", "Change status"),
+        ("event", "Add event"),
+        ("delete", "Delete"),
+    )
+
+    applications = IdsField(coerce=int)
+    action = forms.ChoiceField(choices=ACTIONS)
+    status = forms.TypedChoiceField(
+        choices=ApplicationStatus.choices, coerce=int, required=False
+    )
+    description = forms.CharField(required=False)
+    date = forms.DateField(initial=timezone.now, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get("action")
+        if action == "status" and cleaned_data.get("status") is None:
+            self.add_error("status", "Choose a status.")
+        if action == "event" and not cleaned_data.get("description"):
+            self.add_error("description", "Describe the event.")
+        return cleaned_data
+
+
 class CustomerProfileForm(forms.Form):
     username = forms.CharField(required=False)
     first_name = forms.CharField(required=False)
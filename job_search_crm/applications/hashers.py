@@ -0,0 +1,38 @@
+"""Password hashers whose cost is set by settings.PASSWORD_HASHER_COST.
+
+settings.PASSWORD_HASHER picks one of TIERS for new passwords. The cost of
+the chosen tier can be raised as hardware gets faster; see the
+calibrate_password_hasher command. Django rehashes a stored password when its
+user logs in if it was hashed by another tier or with another cost.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+def cost(tier, default):
+    if settings.PASSWORD_HASHER == tier and settings.PASSWORD_HASHER_COST:
+        return int(settings.PASSWORD_HASHER_COST)
+    return default
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = cost("scrypt", hashers.ScryptPasswordHasher.work_factor)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = cost("argon2", hashers.Argon2PasswordHasher.time_cost)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = cost("pbkdf2", hashers.PBKDF2PasswordHasher.iterations)
+
+
+# Tier: (hasher, its cost attribute, the next cost to try when calibrating).
+TIERS = {
+    "scrypt": (ScryptPasswordHasher, "work_factor", lambda cost: cost * 2),
+    "argon2": (Argon2PasswordHasher, "time_cost", lambda cost: cost + 1),
+    "pbkdf2": (PBKDF2PasswordHasher, "iterations", lambda cost: cost * 2),
+    # Only for tests and benchmarks.
+    "fast": (hashers.MD5PasswordHasher, None, None),
+}
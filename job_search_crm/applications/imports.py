@@ -0,0 +1,253 @@
+"""Bulk import of applications from CSV or newline-delimited JSON.
+
+Rows are read one at a time from the input stream and written in batches:
+each batch resolves its companies and positions with one query apiece, creates
+the missing ones with bulk_create and inserts its applications in a single
+transaction. Memory use depends on the batch size, not the file size.
+"""
+
+import csv
+import json
+
+from django.db import transaction
+from django.utils import dateparse
+
+from . import cache
+from .models import (
+    Application,
+    ApplicationStats,
+    ApplicationStatus,
+    Company,
+    Position,
+    SearchDocument,
+    Tag,
+    TagCount,
+    parse_tags,
+)
+from .utils import batched
+
+FORMATS = ("csv", "ndjson")
+MAX_REPORTED_ERRORS = 100
+REQUIRED_COLUMNS = (
+    "company_name",
+    "company_location",
+    "company_sub_industry",
+    "position_name",
+    "min_salary",
+    "max_salary",
+)
+# Statuses may be given by code or by label.
+STATUSES = dict(
+    [(str(status), status) for status in ApplicationStatus]
+    + [(status.label, status) for status in ApplicationStatus]
+)
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append("Line {}: {}".format(line, message))
+
+
+def guess_format(filename):
+    if filename.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return "csv"
+
+
+def read_rows(stream, format):
+    """Yield (line number, row dict) pairs from a text stream."""
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+
+    elif format == "ndjson":
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_num, row if isinstance(row, dict) else None
+
+    else:
+        raise ValueError("Unsupported import format: {}".format(format))
+
+
+def parse_date(value):
+    if not value:
+        return None
+    parsed = dateparse.parse_date(value)
+    if parsed is None:
+        raise ValueError("Invalid date: {}".format(value))
+    return parsed
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def parse_status(value):
+    if value in (None, ""):
+        return ApplicationStatus.OPEN
+    try:
+        return STATUSES[str(value)]
+    except KeyError:
+        raise ValueError("Unknown status: {}".format(value))
+
+
+def clean_row(row):
+    """Validate one row with the same rules as NewApplicationForm.
+
+    Raises ValueError or KeyError for invalid rows.
+    """
+    data = {key: row[key] for key in REQUIRED_COLUMNS}
+    for key in REQUIRED_COLUMNS:
+        if data[key] in (None, ""):
+            raise ValueError("Missing {}.".format(key))
+
+    data["min_salary"] = int(data["min_salary"])
+    data["max_salary"] = int(data["max_salary"])
+    if data["min_salary"] > data["max_salary"]:
+        raise ValueError("Minimum salary must be less than maximum salary.")
+
+    data["is_remote"] = parse_bool(row.get("is_remote", False))
+    data["tech_stack"] = row.get("tech_stack") or ""
+    tags = row.get("tags") or data["tech_stack"]
+    data["tags"] = parse_tags(", ".join(tags) if isinstance(tags, list) else tags)
+    data["start_date"] = parse_date(row.get("start_date"))
+    data["end_date"] = parse_date(row.get("end_date"))
+    data["status"] = parse_status(row.get("status"))
+    return data
+
+
+def clean_rows(rows, result):
+    """Validate rows, recording the invalid ones in `result`."""
+    for line_num, row in rows:
+        if row is None:
+            result.add_error(line_num, "Not a JSON object.")
+            continue
+
+        try:
+            yield clean_row(row)
+        except KeyError as e:
+            result.add_error(line_num, "Missing {}.".format(e.args[0]))
+        except (TypeError, ValueError) as e:
+            result.add_error(line_num, str(e))
+
+
+def import_applications(profile, stream, format="csv", batch_size=1000, progress=None):
+    """Import every row of `stream` as an application of `profile`.
+
+    `progress`, if given, is called with the number of rows read so far after
+    every batch.
+    """
+    result = ImportResult()
+    companies = {}
+    positions = {}
+    for batch in batched(clean_rows(read_rows(stream, format), result), batch_size):
+        with transaction.atomic():
+            import_batch(profile, batch, companies, positions, result)
+        if progress is not None:
+            progress(result.created + result.duplicates + result.invalid)
+    # bulk_create sends no post_save signals.
+    TagCount.objects.refresh([profile.pk])
+    ApplicationStats.objects.refresh([profile.pk])
+    cache.invalidate([profile.user_id])
+    return result
+
+
+def import_batch(profile, rows, companies, positions, result):
+    missing = {row["company_name"] for row in rows} - companies.keys()
+    if missing:
+        companies.update(
+            Company.objects.filter(company_name__in=missing).values_list(
+                "company_name", "id"
+            )
+        )
+        new_companies = {}
+        for row in rows:
+            name = row["company_name"]
+            if name not in companies and name not in new_companies:
+                new_companies[name] = Company(
+                    company_name=name,
+                    location=row["company_location"],
+                    sub_industry=row["company_sub_industry"],
+                )
+        for company in Company.objects.bulk_create(new_companies.values()):
+            companies[company.company_name] = company.pk
+
+    keys = [(companies[row["company_name"]], row["position_name"]) for row in rows]
+    missing = set(keys) - positions.keys()
+    if missing:
+        positions.update(
+            ((company_id, name), pk)
+            for company_id, name, pk in Position.objects.filter(
+                company_id__in={company_id for company_id, __ in missing},
+                position_name__in={name for __, name in missing},
+            ).values_list("company_id", "position_name", "id")
+        )
+        new_positions = {}
+        new_tags = {}
+        for key, row in zip(keys, rows):
+            if key not in positions and key not in new_positions:
+                new_tags[key] = row["tags"]
+                new_positions[key] = Position(
+                    company_id=key[0],
+                    position_name=key[1],
+                    is_remote=row["is_remote"],
+                    min_salary=row["min_salary"],
+                    max_salary=row["max_salary"],
+                    tech_stack=row["tech_stack"],
+                )
+        for position in Position.objects.bulk_create(new_positions.values()):
+            positions[(position.company_id, position.position_name)] = position.pk
+        tag_ids = {
+            tag.name: tag.pk
+            for tag in Tag.objects.for_names(
+                name for names in new_tags.values() for name in names
+            )
+        }
+        Position.tags.through.objects.bulk_create(
+            Position.tags.through(position_id=positions[key], tag_id=tag_ids[name])
+            for key, names in new_tags.items()
+            for name in names
+        )
+
+    position_ids = [positions[key] for key in keys]
+    seen = set(
+        Application.objects.filter(
+            applicant=profile, position_id__in=position_ids
+        ).values_list("position_id", flat=True)
+    )
+    applications = []
+    for position_id, row in zip(position_ids, rows):
+        if position_id in seen:
+            result.duplicates += 1
+            continue
+
+        seen.add(position_id)
+        application = Application(
+            applicant=profile,
+            position_id=position_id,
+            end_date=row["end_date"],
+            status=row["status"],
+        )
+        if row["start_date"]:
+            application.start_date = row["start_date"]
+        applications.append(application)
+
+    Application.objects.bulk_create(applications)
+    SearchDocument.objects.index_applications([a.pk for a in applications])
+    result.created += len(applications)
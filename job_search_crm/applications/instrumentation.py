@@ -0,0 +1,180 @@
+"""Per-view query counts and timings, collected by InstrumentationMiddleware.
+
+Each request records its queries through a database execute wrapper and its
+template rendering through InstrumentedDjangoTemplates. Totals are summed in
+process and added to the ViewTiming table at most every FLUSH_INTERVAL
+seconds, so a request costs a few counter updates in memory rather than a
+database write, and the report covers every worker process.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .models import ViewTiming
+
+logger = logging.getLogger(__name__)
+
+METRICS = (
+    "requests",
+    "queries",
+    "duplicate_queries",
+    "db_us",
+    "template_us",
+    "total_us",
+)
+FLUSH_INTERVAL = 10
+# Requests repeating one statement this often are logged as likely N+1s.
+DUPLICATE_WARNING = 5
+
+current = ContextVar("request_recorder", default=None)
+
+
+class Recorder:
+    """The queries and render time of one request."""
+
+    def __init__(self):
+        self.statements = Counter()
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    @property
+    def queries(self):
+        return sum(self.statements.values())
+
+    @property
+    def duplicate_queries(self):
+        return self.queries - len(self.statements)
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.statements[sql] += 1
+
+    def server_timing(self, total_seconds):
+        timings = [
+            'db;dur={:.1f};desc="{} queries, {} duplicates"'.format(
+                self.db_seconds * 1000, self.queries, self.duplicate_queries
+            ),
+            "tpl;dur={:.1f}".format(self.template_seconds * 1000),
+            "total;dur={:.1f}".format(total_seconds * 1000),
+        ]
+        return ", ".join(timings)
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        recorder = current.get()
+        if recorder is None:
+            return super().render(context, request)
+
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            recorder.template_seconds += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing renders for the current Recorder."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class Totals:
+    """Per-view sums, kept in memory and periodically added to the database."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.flushed = time.monotonic()
+
+    def add(self, view_name, recorder, total_seconds):
+        """Add a request; return the sums due for flush(), or None."""
+        values = (
+            1,
+            recorder.queries,
+            recorder.duplicate_queries,
+            int(recorder.db_seconds * 1000000),
+            int(recorder.template_seconds * 1000000),
+            int(total_seconds * 1000000),
+        )
+        with self.lock:
+            sums = self.pending.setdefault(view_name, [0] * len(METRICS))
+            for i, value in enumerate(values):
+                sums[i] += value
+            if time.monotonic() - self.flushed < FLUSH_INTERVAL:
+                return None
+            pending, self.pending = self.pending, {}
+            self.flushed = time.monotonic()
+        return pending
+
+
+totals = Totals()
+
+
+def flush(pending):
+    """Add per-view sums to the database with F-expressions, so concurrent
+    flushes from other processes aren't lost."""
+    if not pending:
+        return
+    with transaction.atomic():
+        ViewTiming.objects.bulk_create(
+            [ViewTiming(view=view_name) for view_name in pending],
+            ignore_conflicts=True,
+        )
+        for view_name, sums in pending.items():
+            ViewTiming.objects.filter(view=view_name).update(
+                **{metric: F(metric) + value for metric, value in zip(METRICS, sums)}
+            )
+
+
+def record(view_name, recorder, total_seconds):
+    """Count a request; return the sums due for flush(), or None."""
+    if recorder.duplicate_queries:
+        statement, count = recorder.statements.most_common(1)[0]
+        if count >= DUPLICATE_WARNING:
+            logger.warning(
+                "%s ran a query %d times, a likely N+1: %s", view_name, count, statement
+            )
+    return totals.add(view_name, recorder, total_seconds)
+
+
+def report():
+    """Return each view's request count and mean cost per request."""
+    with totals.lock:
+        pending, totals.pending = totals.pending, {}
+    flush(pending)
+
+    rows = []
+    for sums in ViewTiming.objects.filter(requests__gt=0).values("view", *METRICS):
+        requests = sums["requests"]
+        rows.append(
+            {
+                "view": sums["view"],
+                "requests": requests,
+                "queries": sums["queries"] / requests,
+                "duplicate_queries": sums["duplicate_queries"] / requests,
+                "db_ms": sums["db_us"] / requests / 1000,
+                "template_ms": sums["template_us"] / requests / 1000,
+                "total_ms": sums["total_us"] / requests / 1000,
+            }
+        )
+    return sorted(rows, key=lambda row: row["total_ms"] * row["requests"], reverse=True)
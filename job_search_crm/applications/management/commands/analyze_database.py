@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the query planner's statistics, from which the admin estimates "
+        "the size of large tables. Queue it daily, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to analyze (default: default).",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                # Sample each index instead of reading it whole.
+                cursor.execute("PRAGMA analysis_limit = 1000")
+            cursor.execute("ANALYZE")
+        self.stdout.write("Analyzed {}.".format(options["database"]))
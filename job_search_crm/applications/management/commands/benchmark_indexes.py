@@ -0,0 +1,140 @@
+import os
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections, migrations
+from django.db.migrations.loader import MigrationLoader
+
+from applications.models import Application, Event
+from applications.seed import seed
+
+ALIAS = "benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway SQLite database and compare the query plans and "
+        "timings of the hot Application/Event lookups without and with the "
+        "indexes declared in Meta.indexes and Meta.constraints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1000000,
+            help="Total number of applications to seed (default: 1000000).",
+        )
+        parser.add_argument(
+            "--users", type=int, default=1000, help="Number of customers to seed."
+        )
+        parser.add_argument(
+            "--events",
+            type=int,
+            default=1,
+            help="Number of events per application.",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Runs per timed query."
+        )
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        connections.settings[ALIAS] = dict(
+            connections.settings["default"],
+            ENGINE="django.db.backends.sqlite3",
+            NAME=os.path.join(directory, "benchmark.sqlite3"),
+            OPTIONS={},
+        )
+        try:
+            call_command("migrate", database=ALIAS, verbosity=0)
+            self.stdout.write("Seeding {} applications...".format(options["rows"]))
+            started = time.perf_counter()
+            rows = seed(
+                options["users"],
+                max(options["rows"] // options["users"], 1),
+                options["events"],
+                using=ALIAS,
+            )
+            self.stdout.write(
+                "Seeded {} rows in {:.1f}s".format(rows, time.perf_counter() - started)
+            )
+
+            queries = self.hot_queries()
+            state = self.drop_indexes()
+            self.report("Before", queries, options["repeat"])
+            self.create_indexes(state)
+            self.report("After", queries, options["repeat"])
+        finally:
+            connections[ALIAS].close()
+            del connections.settings[ALIAS]
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+
+    def hot_queries(self):
+        application = Application.objects.using(ALIAS).order_by("?").first()
+        return {
+            "applications list": Application.objects.using(ALIAS)
+            .active()
+            .filter(applicant_id=application.applicant_id)
+            .order_by("-last_activity_at", "-id")[:50],
+            "application lookup": Application.objects.using(ALIAS).filter(
+                applicant_id=application.applicant_id,
+                position_id=application.position_id,
+            ),
+            "event timeline": Event.objects.using(ALIAS).filter(
+                application_id=application.pk
+            ),
+        }
+
+    def index_operations(self):
+        """Migration operations adding every index and constraint under test."""
+        operations = []
+        for model in (Application, Event):
+            operations += [
+                migrations.AddIndex(model._meta.model_name, index)
+                for index in model._meta.indexes
+            ]
+            operations += [
+                migrations.AddConstraint(model._meta.model_name, constraint)
+                for constraint in model._meta.constraints
+            ]
+        return operations
+
+    def drop_indexes(self):
+        migration = migrations.Migration("drop_indexes", "applications")
+        migration.operations = [
+            (
+                migrations.RemoveIndex(operation.model_name, operation.index.name)
+                if isinstance(operation, migrations.AddIndex)
+                else migrations.RemoveConstraint(
+                    operation.model_name, operation.constraint.name
+                )
+            )
+            for operation in self.index_operations()
+        ]
+        state = MigrationLoader(connections[ALIAS]).project_state()
+        with connections[ALIAS].schema_editor() as editor:
+            return migration.apply(state, editor)
+
+    def create_indexes(self, state):
+        migration = migrations.Migration("create_indexes", "applications")
+        migration.operations = self.index_operations()
+        with connections[ALIAS].schema_editor() as editor:
+            migration.apply(state, editor)
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def report(self, heading, queries, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(heading))
+        for name, queryset in queries.items():
+            started = time.perf_counter()
+            for __ in range(repeat):
+                list(queryset.all())
+            elapsed = (time.perf_counter() - started) / repeat
+            self.stdout.write("  {}: {:.3f}ms".format(name, elapsed * 1000))
+            for line in queryset.explain().splitlines():
+                self.stdout.write("    " + line)
@@ -0,0 +1,154 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.template import Engine, RequestContext
+from django.test import RequestFactory
+
+from applications.forms import ApplicationStatusForm, BulkApplicationsForm
+from applications.models import Application, Company, Event, Position
+from applications.utils import percentile
+
+# (page, fragment, page context key of the fragment)
+PAGES = (
+    (
+        "applications/applications.html",
+        "applications/applications_list.html",
+        "applications_fragment",
+    ),
+    (
+        "applications/application_details.html",
+        "applications/application_summary.html",
+        "application_fragment",
+    ),
+)
+
+
+def uncached_loaders(loaders):
+    """The loaders wrapped by the cached loader, which load on every lookup."""
+    unwrapped = []
+    for loader in loaders:
+        if isinstance(loader, (list, tuple)) and loader[0].endswith("cached.Loader"):
+            unwrapped.extend(loader[1])
+        else:
+            unwrapped.append(loader)
+    return unwrapped
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the applications and application pages with --items "
+        "applications and events, built in memory, and report p50/p99 render "
+        "time without the cached template loader, with it, and on a fragment "
+        "cache hit, when only the page around the cached fragment is rendered."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--items",
+            type=int,
+            default=1000,
+            help="Applications listed and events in the timeline (default: 1000).",
+        )
+        parser.add_argument(
+            "--renders",
+            type=int,
+            default=50,
+            help="Renders per page and mode (default: 50).",
+        )
+
+    def handle(self, *args, **options):
+        cached = Engine.get_default()
+        uncached = Engine(
+            dirs=cached.dirs,
+            context_processors=cached.context_processors,
+            debug=cached.debug,
+            loaders=uncached_loaders(cached.loaders),
+            string_if_invalid=cached.string_if_invalid,
+            file_charset=cached.file_charset,
+            libraries=cached.libraries,
+        )
+        request = RequestFactory().get("/")
+        request.user = User(pk=1, username="bench", first_name="Bench")
+        fragment_contexts = self.fragment_contexts(options["items"])
+        page_contexts = {
+            "applications/applications.html": {"bulk_form": BulkApplicationsForm()},
+            "applications/application_details.html": {
+                "application_id": 1,
+                "status_form": ApplicationStatusForm(),
+            },
+        }
+
+        self.stdout.write(
+            "{:<40} {:<18} {:>8} {:>8}".format("template", "mode", "p50 ms", "p99 ms")
+        )
+        for page, fragment, key in PAGES:
+
+            def render(engine, fragment_html=None):
+                if fragment_html is None:
+                    fragment_html = engine.get_template(fragment).render(
+                        RequestContext(request, fragment_contexts[fragment])
+                    )
+                context = dict(page_contexts[page], **{key: fragment_html})
+                return engine.get_template(page).render(
+                    RequestContext(request, context)
+                )
+
+            fragment_html = render(cached)
+            modes = (
+                ("uncached loader", lambda: render(uncached)),
+                ("cached loader", lambda: render(cached)),
+                ("cached fragment", lambda: render(cached, fragment_html)),
+            )
+            for mode, run in modes:
+                latencies = self.measure(run, options["renders"])
+                self.stdout.write(
+                    "{:<40} {:<18} {:>8.1f} {:>8.1f}".format(
+                        page,
+                        mode,
+                        percentile(latencies, 0.5) * 1000,
+                        percentile(latencies, 0.99) * 1000,
+                    )
+                )
+
+    def fragment_contexts(self, items):
+        company = Company(pk=1, company_name="Benchmark Company")
+        position = Position(pk=1, company=company, position_name="Engineer")
+        started = date(2018, 5, 1)
+        applications = [
+            Application(pk=i, position=position, start_date=started)
+            for i in range(1, items + 1)
+        ]
+        events = [
+            Event(
+                pk=i,
+                application=applications[0],
+                date=started + timedelta(days=i),
+                description="Followed up.",
+            )
+            for i in range(1, items + 1)
+        ]
+        return {
+            "applications/applications_list.html": {
+                "applications_list": applications,
+                "next_cursor": "cursor",
+                "tag": None,
+                "tag_counts": [],
+            },
+            "applications/application_summary.html": {
+                "application": applications[0],
+                "events": events,
+                "next_events_cursor": "cursor",
+            },
+        }
+
+    def measure(self, run, count):
+        # The first render only warms up the cached loader.
+        run()
+        latencies = []
+        for __ in range(count):
+            started = time.perf_counter()
+            run()
+            latencies.append(time.perf_counter() - started)
+        return latencies
@@ -0,0 +1,159 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from applications import cache
+from applications.models import Application, CustomerProfile
+from applications.utils import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the CRM views through the test client as a seeded customer (see "
+        "seed_benchmark) and report p50/p99 latency and query counts. With "
+        "--baseline, fail if a view runs more queries or its p99 latency grows "
+        "beyond the tolerance. Writes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", default="bench0", help="Username of the customer to act as."
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Requests per view (default: 50).",
+        )
+        parser.add_argument("--baseline", help="JSON results to compare against.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed p99 growth over the baseline (default: 0.25).",
+        )
+        parser.add_argument("--save", help="Write the results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        try:
+            profile = CustomerProfile.objects.select_related("user").get(
+                user__username=options["user"]
+            )
+        except CustomerProfile.DoesNotExist:
+            raise CommandError("No customer profile for {}.".format(options["user"]))
+        application = Application.objects.filter(applicant=profile).first()
+        if application is None:
+            raise CommandError("{} has no applications.".format(options["user"]))
+
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            client = Client()
+            client.force_login(profile.user)
+            results = {
+                name: self.measure(client, name, request, options["requests"])
+                for name, request in self.scenarios(client, profile, application)
+            }
+
+        self.stdout.write(
+            "{:<28} {:>8} {:>8} {:>8}".format("view", "p50 ms", "p99 ms", "queries")
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                "{:<28} {:>8.1f} {:>8.1f} {:>8}".format(
+                    name, result["p50_ms"], result["p99_ms"], result["queries"]
+                )
+            )
+
+        if options["save"]:
+            with open(options["save"], "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            regressions = list(
+                self.regressions(results, baseline, options["tolerance"])
+            )
+            if regressions:
+                raise CommandError("Regressions:\n" + "\n".join(regressions))
+
+    def scenarios(self, client, profile, application):
+        """Yield (name, request) pairs; each request returns a response."""
+        applications = reverse("applications:applications")
+        detail = reverse("applications:application", args=[application.pk])
+        new_application = reverse("applications:new_application")
+        new_event = reverse("applications:new_event", args=[application.pk])
+        profile_url = reverse("applications:view_profile")
+        counter = iter(range(1000000000))
+
+        def uncached(path):
+            cache.invalidate([profile.user_id])
+            return client.get(path)
+
+        yield "applications", lambda: client.get(applications)
+        yield "applications (uncached)", lambda: uncached(applications)
+        yield "application", lambda: client.get(detail)
+        yield "application (uncached)", lambda: uncached(detail)
+        yield "new application form", lambda: client.get(new_application)
+        yield "new application", lambda: client.post(
+            new_application,
+            {
+                "company_name": "Benchmark Company",
+                "company_location": "City, State",
+                "company_sub_industry": "Software",
+                "position_name": "Benchmark {}".format(next(counter)),
+                "min_salary": 50000,
+                "max_salary": 60000,
+                "tech_stack": "Python, Django",
+            },
+        )
+        yield "new event form", lambda: client.get(new_event)
+        yield "new event", lambda: client.post(
+            new_event, {"description": "Followed up.", "date": "2018-05-01"}
+        )
+        yield "profile", lambda: client.get(profile_url)
+        yield "profile update", lambda: client.post(
+            profile_url, {"bio": "Benchmarking."}
+        )
+
+    def measure(self, client, name, request, count):
+        # The first request only warms up caches and connections.
+        self.run(name, request)
+        latencies = []
+        queries = 0
+        for __ in range(count):
+            elapsed, context = self.run(name, request)
+            latencies.append(elapsed)
+            queries = max(queries, len(context))
+        return {
+            "p50_ms": percentile(latencies, 0.5) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "queries": queries,
+        }
+
+    def run(self, name, request):
+        with transaction.atomic(), CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = request()
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        if response.status_code >= 400:
+            raise CommandError("{} returned {}.".format(name, response.status_code))
+        return elapsed, context
+
+    def regressions(self, results, baseline, tolerance):
+        for name, result in results.items():
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+            if result["queries"] > expected["queries"]:
+                yield "{}: {} queries, baseline {}".format(
+                    name, result["queries"], expected["queries"]
+                )
+            if result["p99_ms"] > expected["p99_ms"] * (1 + tolerance):
+                yield "{}: p99 {:.1f}ms, baseline {:.1f}ms".format(
+                    name, result["p99_ms"], expected["p99_ms"]
+                )
@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.hashers import TIERS
+
+
+class Command(BaseCommand):
+    help = (
+        "Find the cost of the configured password hasher that makes one hash "
+        "take about --target-ms on this machine, to set as "
+        "PASSWORD_HASHER_COST."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target-ms",
+            type=float,
+            default=250,
+            help="Time one hash should take (default: 250).",
+        )
+        parser.add_argument(
+            "--start",
+            type=int,
+            help="Cost to start from (default: a quarter of the current cost).",
+        )
+
+    def handle(self, *args, **options):
+        hasher_class, attribute, next_cost = TIERS[settings.PASSWORD_HASHER]
+        if attribute is None:
+            raise CommandError(
+                "The {} hasher has no cost.".format(settings.PASSWORD_HASHER)
+            )
+
+        hasher = hasher_class()
+        cost = options["start"] or max(getattr(hasher, attribute) // 4, 1)
+        while True:
+            setattr(hasher, attribute, cost)
+            started = time.perf_counter()
+            hasher.encode("calibration", hasher.salt())
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= options["target_ms"]:
+                break
+            cost = next_cost(cost)
+
+        self.stdout.write(
+            "PASSWORD_HASHER_COST={} ({} {}, {:.0f} ms per hash)".format(
+                cost, settings.PASSWORD_HASHER, attribute, elapsed_ms
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from applications import tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue a maintenance command for run_worker, for instance from cron: "
+        "refresh_stats nightly and clearsessions daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("command", choices=tasks.COMMANDS)
+
+    def handle(self, *args, **options):
+        task = tasks.enqueue("management_command", command=options["command"])
+        self.stdout.write("Queued task {}.".format(task.pk))
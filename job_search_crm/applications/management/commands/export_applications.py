@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.exports import FORMATS, export_applications
+from applications.models import CustomerProfile
+
+
+class Command(BaseCommand):
+    help = "Export a customer's applications and events as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", required=True, help="Username of the exported customer."
+        )
+        parser.add_argument(
+            "--format", choices=FORMATS, default="csv", help="Output format."
+        )
+        parser.add_argument(
+            "--output", help="File to write to (default: standard output)."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            profile = CustomerProfile.objects.get(user__username=options["user"])
+        except CustomerProfile.DoesNotExist:
+            raise CommandError("No customer profile for {}.".format(options["user"]))
+
+        chunks = export_applications(profile, options["format"])
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as f:
+                f.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
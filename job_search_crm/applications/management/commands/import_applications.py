@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.imports import FORMATS, guess_format, import_applications
+from applications.models import CustomerProfile
+
+
+class Command(BaseCommand):
+    help = "Import applications for a customer from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument(
+            "--user", required=True, help="Username of the importing customer."
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="File format (default: guessed from the file extension).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows written per transaction (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            profile = CustomerProfile.objects.get(user__username=options["user"])
+        except CustomerProfile.DoesNotExist:
+            raise CommandError("No customer profile for {}.".format(options["user"]))
+
+        format = options["format"] or guess_format(options["path"])
+        # utf-8-sig drops the byte order mark Excel writes at the start.
+        with open(options["path"], newline="", encoding="utf-8-sig") as stream:
+            result = import_applications(
+                profile, stream, format, batch_size=options["batch_size"]
+            )
+
+        for error in result.errors:
+            self.stderr.write(error)
+        self.stdout.write(
+            "Imported {} applications ({} duplicates, {} invalid rows).".format(
+                result.created, result.duplicates, result.invalid
+            )
+        )
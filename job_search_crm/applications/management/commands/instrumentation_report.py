@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from applications import instrumentation
+
+COLUMNS = (
+    ("view", "{:<40}", "{:<40}"),
+    ("requests", "{:>9}", "{:>9}"),
+    ("queries", "{:>8}", "{:>8.1f}"),
+    ("duplicate_queries", "{:>11}", "{:>11.1f}"),
+    ("db_ms", "{:>8}", "{:>8.1f}"),
+    ("template_ms", "{:>12}", "{:>12.1f}"),
+    ("total_ms", "{:>9}", "{:>9.1f}"),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the mean queries, duplicate queries, database, template and total "
+        "time per request of every view recorded by InstrumentationMiddleware, "
+        "most expensive overall first."
+    )
+
+    def handle(self, *args, **options):
+        rows = instrumentation.report()
+        if not rows:
+            self.stdout.write(
+                "Nothing recorded; set INSTRUMENT_REQUESTS = True in settings."
+            )
+            return
+
+        self.stdout.write(
+            " ".join(
+                heading.format(name.replace("_queries", "s"))
+                for name, heading, __ in COLUMNS
+            )
+        )
+        for row in rows:
+            self.stdout.write(
+                " ".join(cell.format(row[name]) for name, __, cell in COLUMNS)
+            )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from applications.models import Application
+from applications.utils import batched
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the event count, last event date and last activity of every "
+        "application from its events, with one UPDATE per batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Applications updated per statement (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        updated = 0
+        ids = Application.objects.values_list("pk", flat=True).iterator()
+        for batch in batched(ids, options["batch_size"]):
+            updated += Application.objects.filter(pk__in=batch).recount_events()
+        self.stdout.write("Recounted the events of {} applications.".format(updated))
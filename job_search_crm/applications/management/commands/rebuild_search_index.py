@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from applications.models import Application, Event, SearchDocument
+from applications.utils import batched
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents of every application and event."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Objects indexed per transaction (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        SearchDocument.objects.all().delete()
+        for model, index in (
+            (Application, SearchDocument.objects.index_applications),
+            (Event, SearchDocument.objects.index_events),
+        ):
+            ids = model.objects.values_list("pk", flat=True).iterator()
+            for batch in batched(ids, options["batch_size"]):
+                index(batch)
+        self.stdout.write(
+            "Indexed {} documents.".format(SearchDocument.objects.count())
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from applications.models import ApplicationStats, CustomerProfile
+from applications.utils import batched
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the analytics rollups of every customer. Meant to run "
+        "nightly, to pick up changes that send no signals, such as bulk updates "
+        "and edits to companies or positions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Customers refreshed per batch (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        ids = CustomerProfile.objects.values_list("pk", flat=True).iterator()
+        for batch in batched(ids, options["batch_size"]):
+            ApplicationStats.objects.refresh(batch)
+        self.stdout.write(
+            "Refreshed {} customers.".format(ApplicationStats.objects.count())
+        )
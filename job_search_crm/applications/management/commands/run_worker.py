@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from applications import tasks
+from applications.models import Task, TaskStatus
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks in a pool of processes, one task per "
+        "process at a time, polling the database for new ones. Failed tasks "
+        "are retried with backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Worker processes (default: one per core). 0 runs tasks in "
+            "this process.",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=1.0,
+            help="Seconds between checks for new tasks (default: 1).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no task is due instead of waiting for more.",
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(caches["default"], LocMemCache):
+            self.stderr.write(
+                "The default cache is local to each process: pages the tasks "
+                "change will be served stale from the site's cache."
+            )
+        self.lease = settings.TASK_LEASE_SECONDS
+        if options["processes"] == 0:
+            self.run_inline(options)
+            return
+
+        while True:
+            # Spawned processes open their own connections instead of sharing
+            # this process's.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options["processes"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            ) as pool:
+                try:
+                    self.run_pool(pool, options)
+                    return
+                except BrokenProcessPool:
+                    self.stderr.write("A worker process died; restarting the pool.")
+
+    def run_inline(self, options):
+        while True:
+            claimed = Task.objects.claim(1, self.lease)
+            if not claimed:
+                if options["once"]:
+                    return
+                time.sleep(options["poll"])
+                continue
+            self.report(claimed[0], tasks.run(claimed[0], self.lease))
+
+    def run_pool(self, pool, options):
+        running = {}
+        claimed = []
+        try:
+            self.run_claimed(pool, options, running, claimed)
+        except BrokenProcessPool:
+            # A dead process takes the whole pool down, along with the tasks
+            # running in the others, so requeue all of them rather than leave
+            # them leased and idle. Each loses the attempt, so a task that
+            # kills its process still runs out of them.
+            Task.objects.filter(pk__in=[*running.values(), *claimed]).release()
+            raise
+
+    def run_claimed(self, pool, options, running, claimed):
+        while True:
+            free = options["processes"] - len(running)
+            claimed[:] = Task.objects.claim(free, self.lease) if free else ()
+            while claimed:
+                running[pool.submit(tasks.run, claimed[0], self.lease)] = claimed[0]
+                claimed.pop(0)
+            if not running:
+                if options["once"]:
+                    return
+                time.sleep(options["poll"])
+                continue
+
+            finished, __ = wait(
+                running, timeout=options["poll"], return_when=FIRST_COMPLETED
+            )
+            for future in finished:
+                try:
+                    status = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    # run() couldn't record the outcome; the task runs again
+                    # when its lease expires.
+                    self.stderr.write(
+                        "Task {} was lost: {!r}".format(running[future], e)
+                    )
+                else:
+                    self.report(running[future], status)
+                del running[future]
+
+    def report(self, task_id, status):
+        self.stdout.write("Task {}: {}.".format(task_id, TaskStatus(status).label))
@@ -0,0 +1,87 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.models import ApplicationStats, CustomerProfile, TagCount
+from applications.seed import seed
+from applications.utils import batched
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic customers, applications and events "
+        "for benchmark_views, written with bulk_create in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=10000, help="Customers (default: 10000)."
+        )
+        parser.add_argument(
+            "--applications",
+            type=int,
+            default=1000000,
+            help="Total applications (default: 1000000).",
+        )
+        parser.add_argument(
+            "--events",
+            type=int,
+            default=10000000,
+            help="Total events (default: 10000000).",
+        )
+        parser.add_argument(
+            "--companies", type=int, default=1000, help="Companies (default: 1000)."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows written per transaction (default: 5000).",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="bench",
+            help="Prefix of the generated usernames and company names.",
+        )
+        parser.add_argument(
+            "--search-index",
+            action="store_true",
+            help="Also build the search documents, which takes about as long "
+            "as seeding.",
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                "Users named {}* already exist; pass another --prefix.".format(prefix)
+            )
+
+        applications_per_user = max(options["applications"] // options["users"], 1)
+        started = time.perf_counter()
+        rows = seed(
+            options["users"],
+            applications_per_user,
+            options["events"] // (applications_per_user * options["users"]),
+            companies=options["companies"],
+            batch_size=options["batch_size"],
+            prefix=prefix,
+        )
+        self.stdout.write(
+            "Seeded {} rows in {:.1f}s.".format(rows, time.perf_counter() - started)
+        )
+
+        started = time.perf_counter()
+        profile_ids = CustomerProfile.objects.filter(
+            user__username__startswith=prefix
+        ).values_list("pk", flat=True)
+        for batch in batched(list(profile_ids), 1000):
+            TagCount.objects.refresh(batch)
+            ApplicationStats.objects.refresh(batch)
+        if options["search_index"]:
+            call_command("rebuild_search_index", stdout=self.stdout)
+        self.stdout.write(
+            "Built derived rows in {:.1f}s.".format(time.perf_counter() - started)
+        )
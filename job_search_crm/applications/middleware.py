@@ -0,0 +1,178 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponseRedirect
+from django.urls import reverse
+
+from . import instrumentation, routers
+
+
+def profile_required(view_func):
+    """Mark a view as needing the customer profile of a logged in user.
+
+    Logged in users without a profile are sent to the profile creation page by
+    CustomerProfileMiddleware; anonymous users are left to login_required.
+    """
+    view_func.profile_required = True
+    return view_func
+
+
+class CustomerProfileMiddleware:
+    """Attach the user's CustomerProfile, or None, to the request as `customer`.
+
+    The profile is loaded with the user by CustomerProfileBackend, so this
+    costs no extra query.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        user = request.user
+        request.customer = getattr(user, "customerprofile", None)
+
+        # Hand async views and decorators the loaded user instead of letting
+        # them query it again.
+        async def auser():
+            return user
+
+        request.auser = auser
+        if (
+            getattr(view_func, "profile_required", False)
+            and request.user.is_authenticated
+            and request.customer is None
+        ):
+            return HttpResponseRedirect(reverse("applications:create_profile"))
+
+
+class InstrumentationMiddleware:
+    """Record each request's queries and timings under its URL name.
+
+    Enabled by settings.INSTRUMENT_REQUESTS. The request's figures are summed
+    per view, see the instrumentation_report command, and sent back in a
+    Server-Timing header to staff, or to everyone in DEBUG.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENT_REQUESTS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = instrumentation.Recorder()
+        token = instrumentation.current.set(recorder)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, recorder)
+                response = self.get_response(request)
+        finally:
+            instrumentation.current.reset(token)
+        user = getattr(request, "user", None)
+        pending = self.record(request, response, recorder, started, user)
+        if pending:
+            instrumentation.flush(pending)
+        return response
+
+    async def __acall__(self, request):
+        recorder = instrumentation.Recorder()
+        token = instrumentation.current.set(recorder)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                # Connections belong to the thread the request's ORM calls run
+                # in, not to the event loop's.
+                await sync_to_async(self.wrap_connections)(stack, recorder)
+                response = await self.get_response(request)
+        finally:
+            instrumentation.current.reset(token)
+        user = await request.auser() if hasattr(request, "auser") else None
+        pending = self.record(request, response, recorder, started, user)
+        if pending:
+            await sync_to_async(instrumentation.flush)(pending)
+        return response
+
+    def wrap_connections(self, stack, recorder):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder.execute))
+
+    def record(self, request, response, recorder, started, user):
+        """Count the request; return the totals due for flushing, or None."""
+        total_seconds = time.perf_counter() - started
+        match = request.resolver_match
+        view_name = match.view_name if match else "unresolved"
+        # Timings tell how much data a view went through, so only staff see them.
+        if settings.DEBUG or getattr(user, "is_staff", False):
+            response["Server-Timing"] = recorder.server_timing(total_seconds)
+        return instrumentation.record(view_name, recorder, total_seconds)
+
+
+class ReplicaPinMiddleware:
+    """Track each request's writes for PrimaryReplicaRouter.
+
+    Enabled when settings.REPLICA_DATABASES is set. A request that writes sets
+    a cookie keeping the user's reads on the primary for
+    settings.REPLICA_PIN_SECONDS.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state = routers.RoutingState(pinned=routers.PIN_COOKIE in request.COOKIES)
+        token = routers.current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.current.reset(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        state = routers.RoutingState(pinned=routers.PIN_COOKIE in request.COOKIES)
+        token = routers.current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.current.reset(token)
+        return self.pin(state, response)
+
+    def pin(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
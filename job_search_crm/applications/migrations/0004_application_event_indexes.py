@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0003_application_event"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="company",
+            options={"verbose_name_plural": "Companies"},
+        ),
+        migrations.AlterModelOptions(
+            name="event",
+            options={"ordering": ["-date"]},
+        ),
+        migrations.AlterField(
+            model_name="application",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("0", "Open"),
+                    ("1", "Declined by employer"),
+                    ("2", "Offer extended"),
+                    ("3", "Position accepted"),
+                    ("4", "Declined by applicant"),
+                ],
+                default="Open",
+                max_length=50,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["applicant", "status", "start_date"],
+                name="application_applicant_status",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["application", "-date"], name="event_application_date"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="application",
+            constraint=models.UniqueConstraint(
+                fields=("applicant", "position"), name="unique_application"
+            ),
+        ),
+    ]
@@ -0,0 +1,176 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:38
+
+from itertools import islice
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_CREATE = (
+    """
+    CREATE VIRTUAL TABLE applications_searchdocument_fts USING fts5(
+        body,
+        applicant_id,
+        content='applications_searchdocument',
+        content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER applications_searchdocument_ai
+    AFTER INSERT ON applications_searchdocument BEGIN
+        INSERT INTO applications_searchdocument_fts(rowid, body, applicant_id)
+        VALUES (new.id, new.body, new.applicant_id);
+    END
+    """,
+    """
+    CREATE TRIGGER applications_searchdocument_ad
+    AFTER DELETE ON applications_searchdocument BEGIN
+        INSERT INTO applications_searchdocument_fts(
+            applications_searchdocument_fts, rowid, body, applicant_id
+        )
+        VALUES ('delete', old.id, old.body, old.applicant_id);
+    END
+    """,
+    """
+    CREATE TRIGGER applications_searchdocument_au
+    AFTER UPDATE ON applications_searchdocument BEGIN
+        INSERT INTO applications_searchdocument_fts(
+            applications_searchdocument_fts, rowid, body, applicant_id
+        )
+        VALUES ('delete', old.id, old.body, old.applicant_id);
+        INSERT INTO applications_searchdocument_fts(rowid, body, applicant_id)
+        VALUES (new.id, new.body, new.applicant_id);
+    END
+    """,
+)
+SQLITE_DROP = (
+    "DROP TRIGGER applications_searchdocument_au",
+    "DROP TRIGGER applications_searchdocument_ad",
+    "DROP TRIGGER applications_searchdocument_ai",
+    "DROP TABLE applications_searchdocument_fts",
+)
+POSTGRESQL_CREATE = (
+    """
+    ALTER TABLE applications_searchdocument ADD COLUMN body_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', body)) STORED
+    """,
+    """
+    CREATE INDEX applications_searchdocument_body_vector
+    ON applications_searchdocument USING GIN (body_vector)
+    """,
+)
+POSTGRESQL_DROP = (
+    "DROP INDEX applications_searchdocument_body_vector",
+    "ALTER TABLE applications_searchdocument DROP COLUMN body_vector",
+)
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+
+    return operation
+
+
+def bulk_create(model, objs, using, batch_size=1000):
+    while True:
+        batch = list(islice(objs, batch_size))
+        if not batch:
+            return
+        model.objects.using(using).bulk_create(batch)
+
+
+def index_existing(apps, schema_editor):
+    Application = apps.get_model("applications", "Application")
+    Event = apps.get_model("applications", "Event")
+    SearchDocument = apps.get_model("applications", "SearchDocument")
+    using = schema_editor.connection.alias
+    applications = Application.objects.using(using).values_list(
+        "pk",
+        "applicant_id",
+        "position__company__company_name",
+        "position__company__sub_industry",
+        "position__position_name",
+        "position__tech_stack",
+    )
+    bulk_create(
+        SearchDocument,
+        (
+            SearchDocument(
+                applicant_id=applicant_id,
+                application_id=pk,
+                body=" ".join(text for text in texts if text),
+            )
+            for pk, applicant_id, *texts in applications.iterator()
+        ),
+        using,
+    )
+    events = Event.objects.using(using).values_list(
+        "pk", "application_id", "application__applicant_id", "description"
+    )
+    bulk_create(
+        SearchDocument,
+        (
+            SearchDocument(
+                applicant_id=applicant_id,
+                application_id=application_id,
+                event_id=pk,
+                body=description,
+            )
+            for pk, application_id, applicant_id, description in events.iterator()
+        ),
+        using,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0004_application_event_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("body", models.TextField()),
+                (
+                    "applicant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="applications.customerprofile",
+                    ),
+                ),
+                (
+                    "application",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="applications.application",
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="applications.event",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(
+            run({"sqlite": SQLITE_CREATE, "postgresql": POSTGRESQL_CREATE}),
+            run({"sqlite": SQLITE_DROP, "postgresql": POSTGRESQL_DROP}),
+        ),
+        migrations.RunPython(index_existing, migrations.RunPython.noop),
+    ]
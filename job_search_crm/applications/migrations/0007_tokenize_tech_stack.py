@@ -0,0 +1,84 @@
+import re
+from itertools import islice
+
+from django.db import migrations, models
+
+ACTIVE_APPLICATION_STATUSES = ("Open", "Offer extended")
+
+
+def parse_tags(text):
+    tags = []
+    for tag in re.split(r"[,;/|\n]+", text or ""):
+        tag = tag.strip().lower()[:50]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def batches(iterable, size=1000):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def tokenize_tech_stack(apps, schema_editor):
+    Application = apps.get_model("applications", "Application")
+    Position = apps.get_model("applications", "Position")
+    Tag = apps.get_model("applications", "Tag")
+    TagCount = apps.get_model("applications", "TagCount")
+    PositionTag = Position.tags.through
+    using = schema_editor.connection.alias
+
+    positions = (
+        Position.objects.using(using)
+        .exclude(tech_stack=None)
+        .values_list("pk", "tech_stack")
+    )
+    for batch in batches(positions.iterator()):
+        parsed = [(pk, parse_tags(tech_stack)) for pk, tech_stack in batch]
+        names = {name for __, tags in parsed for name in tags}
+        Tag.objects.using(using).bulk_create(
+            [Tag(name=name) for name in names], ignore_conflicts=True
+        )
+        tag_ids = dict(
+            Tag.objects.using(using).filter(name__in=names).values_list("name", "pk")
+        )
+        PositionTag.objects.using(using).bulk_create(
+            [
+                PositionTag(position_id=pk, tag_id=tag_ids[name])
+                for pk, tags in parsed
+                for name in tags
+            ],
+            ignore_conflicts=True,
+        )
+
+    counts = (
+        Application.objects.using(using)
+        .filter(status__in=ACTIVE_APPLICATION_STATUSES, position__tags__isnull=False)
+        .values_list("applicant_id", "position__tags")
+        .annotate(count=models.Count("pk"))
+        .order_by()
+    )
+    for batch in batches(counts.iterator()):
+        TagCount.objects.using(using).bulk_create(
+            TagCount(applicant_id=applicant_id, tag_id=tag_id, count=count)
+            for applicant_id, tag_id, count in batch
+        )
+
+
+def clear_tags(apps, schema_editor):
+    using = schema_editor.connection.alias
+    apps.get_model("applications", "TagCount").objects.using(using).delete()
+    Position = apps.get_model("applications", "Position")
+    Position.tags.through.objects.using(using).delete()
+    apps.get_model("applications", "Tag").objects.using(using).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("applications", "0006_tags")]
+
+    operations = [migrations.RunPython(tokenize_tech_stack, clear_tags)]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0007_tokenize_tech_stack"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationStats",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("responded", models.PositiveIntegerField(default=0)),
+                ("median_days", models.FloatField(null=True)),
+                ("status_counts", models.JSONField(default=dict)),
+                ("events_per_week", models.JSONField(default=list)),
+                ("salaries", models.JSONField(default=list)),
+                ("updated", models.DateTimeField(auto_now=True)),
+                (
+                    "applicant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="applications.customerprofile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Application stats",
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations, models
+
+# Status labels, some of which were stored instead of their codes.
+STATUS_LABELS = (
+    ("0", "Open"),
+    ("1", "Declined by employer"),
+    ("2", "Offer extended"),
+    ("3", "Position accepted"),
+    ("4", "Declined by applicant"),
+)
+
+
+def labels_to_codes(apps, schema_editor):
+    using = schema_editor.connection.alias
+    applications = apps.get_model("applications", "Application").objects.using(using)
+    for code, label in STATUS_LABELS:
+        applications.filter(status=label).update(status=code)
+    # Rollups are keyed by the old labels; the stats page recomputes them.
+    apps.get_model("applications", "ApplicationStats").objects.using(using).delete()
+
+
+def codes_to_labels(apps, schema_editor):
+    using = schema_editor.connection.alias
+    applications = apps.get_model("applications", "Application").objects.using(using)
+    for code, label in STATUS_LABELS:
+        applications.filter(status=code).update(status=label)
+    apps.get_model("applications", "ApplicationStats").objects.using(using).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("applications", "0008_application_stats")]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="application", name="application_applicant_status"
+        ),
+        migrations.RunPython(labels_to_codes, codes_to_labels),
+        migrations.AlterField(
+            model_name="application",
+            name="status",
+            field=models.SmallIntegerField(
+                choices=[
+                    (0, "Open"),
+                    (1, "Declined by employer"),
+                    (2, "Offer extended"),
+                    (3, "Position accepted"),
+                    (4, "Declined by applicant"),
+                ],
+                default=0,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                condition=models.Q(("status__in", (0, 2))),
+                fields=["applicant", "-start_date", "-id"],
+                name="application_active",
+            ),
+        ),
+    ]
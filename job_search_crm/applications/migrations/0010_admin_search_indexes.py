@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0009_application_status_code"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="application",
+            name="start_date",
+            field=models.DateField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="company",
+            name="company_name",
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name="event",
+            name="date",
+            field=models.DateField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="position",
+            name="position_name",
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+    ]
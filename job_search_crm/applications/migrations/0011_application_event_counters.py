@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:38
+
+from itertools import islice
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import Cast, Coalesce
+
+
+def batches(iterable, size=1000):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def count_events(apps, schema_editor):
+    Application = apps.get_model("applications", "Application")
+    Event = apps.get_model("applications", "Event")
+    using = schema_editor.connection.alias
+
+    events = Event.objects.using(using).filter(application=models.OuterRef("pk"))
+    counts = (
+        events.order_by()
+        .values("application")
+        .annotate(count=models.Count("pk"))
+        .values("count")
+    )
+    latest = models.Subquery(events.order_by("-date").values("date")[:1])
+    ids = Application.objects.using(using).values_list("pk", flat=True)
+    for batch in batches(ids.iterator()):
+        Application.objects.using(using).filter(pk__in=batch).update(
+            event_count=Coalesce(models.Subquery(counts), 0),
+            last_event_date=latest,
+            # Existing applications were last active on their last event.
+            last_activity_at=Cast(
+                Coalesce(latest, "start_date"), models.DateTimeField()
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0010_admin_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="application",
+            name="application_active",
+        ),
+        migrations.AddField(
+            model_name="application",
+            name="event_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="application",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="application",
+            name="last_event_date",
+            field=models.DateField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                condition=models.Q(("status__in", (0, 2))),
+                fields=["applicant", "-last_activity_at", "-id"],
+                name="application_active",
+            ),
+        ),
+        migrations.RunPython(count_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0012_task"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ViewTiming",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("view", models.CharField(max_length=200, unique=True)),
+                ("requests", models.PositiveBigIntegerField(default=0)),
+                ("queries", models.PositiveBigIntegerField(default=0)),
+                ("duplicate_queries", models.PositiveBigIntegerField(default=0)),
+                ("db_us", models.PositiveBigIntegerField(default=0)),
+                ("template_us", models.PositiveBigIntegerField(default=0)),
+                ("total_us", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+from itertools import islice
+
+from django.db import migrations, models
+
+# Codes of the Open and Offer extended statuses, matched by application_active.
+ACTIVE_APPLICATION_STATUSES = (0, 2)
+
+
+def batches(iterable, size=1000):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def recount_tags(apps, schema_editor):
+    """Recount every customer's tags by status code.
+
+    0007 counted the applications whose status was stored as a label and
+    missed those stored as a code, and 0009 left the counts as they were.
+    """
+    Application = apps.get_model("applications", "Application")
+    TagCount = apps.get_model("applications", "TagCount")
+    using = schema_editor.connection.alias
+
+    TagCount.objects.using(using).delete()
+    counts = (
+        Application.objects.using(using)
+        .filter(status__in=ACTIVE_APPLICATION_STATUSES, position__tags__isnull=False)
+        .values_list("applicant_id", "position__tags")
+        .annotate(count=models.Count("pk"))
+        .order_by()
+    )
+    for batch in batches(counts.iterator()):
+        TagCount.objects.using(using).bulk_create(
+            TagCount(applicant_id=applicant_id, tag_id=tag_id, count=count)
+            for applicant_id, tag_id, count in batch
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("applications", "0013_viewtiming")]
+
+    operations = [migrations.RunPython(recount_tags, migrations.RunPython.noop)]
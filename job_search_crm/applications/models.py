@@ -1,9 +1,16 @@
+import re
+from datetime import timedelta
+
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, router, transaction
+from django.db.models.functions import Cast, Coalesce, Greatest, RowNumber, TruncWeek
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
+from . import cache
+from .utils import batched
+
 
 class CustomerProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -16,7 +23,7 @@ class CustomerProfile(models.Model):
 
 
 class Company(models.Model):
-    company_name = models.CharField(max_length=50)
+    company_name = models.CharField(max_length=50, db_index=True)
     location = models.CharField(max_length=50)
     sub_industry = models.CharField(max_length=50)
 
@@ -27,47 +34,850 @@ class Company(models.Model):
         return self.company_name
 
 
+def parse_tags(text):
+    """Split a free-text tech stack such as "Python, Django/Postgres" into tags."""
+    tags = []
+    for tag in re.split(r"[,;/|\n]+", text or ""):
+        tag = tag.strip().lower()[:50]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+class TagManager(models.Manager):
+    def for_names(self, names):
+        """Return the tags with the given names, creating the missing ones."""
+        names = set(names)
+        self.bulk_create(
+            [self.model(name=name) for name in names], ignore_conflicts=True
+        )
+        return list(self.filter(name__in=names))
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+
+    objects = TagManager()
+
+    def __str__(self):
+        return self.name
+
+
 class Position(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE)
-    position_name = models.CharField(max_length=50)
+    position_name = models.CharField(max_length=50, db_index=True)
     is_remote = models.BooleanField()
     min_salary = models.IntegerField()
     max_salary = models.IntegerField()
     tech_stack = models.TextField(max_length=500, blank=True, null=True)
+    tags = models.ManyToManyField(Tag, blank=True)
 
     def __str__(self):
         return " at ".join((self.position_name, self.company.company_name))
 
 
-APPLICATION_STATUS_CHOICES = (
-    ("0", "Open"),
-    ("1", "Declined by employer"),
-    ("2", "Offer extended"),
-    ("3", "Position accepted"),
-    ("4", "Declined by applicant"),
-)
+class ApplicationStatus(models.IntegerChoices):
+    OPEN = 0, "Open"
+    DECLINED_BY_EMPLOYER = 1, "Declined by employer"
+    OFFER_EXTENDED = 2, "Offer extended"
+    POSITION_ACCEPTED = 3, "Position accepted"
+    DECLINED_BY_APPLICANT = 4, "Declined by applicant"
+
+
+APPLICATION_STATUS_CHOICES = ApplicationStatus.choices
+
+# Statuses of applications that are still in progress.
+ACTIVE_APPLICATION_STATUSES = (ApplicationStatus.OPEN, ApplicationStatus.OFFER_EXTENDED)
+
+# Statuses each status may change to. Statuses without any are terminal.
+STATUS_TRANSITIONS = {
+    ApplicationStatus.OPEN: (
+        ApplicationStatus.DECLINED_BY_EMPLOYER,
+        ApplicationStatus.OFFER_EXTENDED,
+        ApplicationStatus.DECLINED_BY_APPLICANT,
+    ),
+    ApplicationStatus.OFFER_EXTENDED: (
+        ApplicationStatus.DECLINED_BY_EMPLOYER,
+        ApplicationStatus.POSITION_ACCEPTED,
+        ApplicationStatus.DECLINED_BY_APPLICANT,
+    ),
+    ApplicationStatus.DECLINED_BY_EMPLOYER: (),
+    ApplicationStatus.POSITION_ACCEPTED: (),
+    ApplicationStatus.DECLINED_BY_APPLICANT: (),
+}
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class IntegerIn(models.Func):
+    """`expression IN (values)` with the integers written into the SQL.
+
+    SQLite only uses a partial index when the query repeats the index
+    condition literally; a condition with bound parameters doesn't qualify.
+    """
+
+    template = "%(expressions)s IN (%(values)s)"
+    output_field = models.BooleanField()
+
+    def __init__(self, expression, values):
+        super().__init__(
+            expression, values=", ".join(str(int(value)) for value in values)
+        )
+
+
+class ApplicationQuerySet(models.QuerySet):
+    def active(self):
+        """Applications still in progress, read through application_active."""
+        return self.filter(IntegerIn("status", ACTIVE_APPLICATION_STATUSES))
+
+    def transition(self, status, date=None):
+        """Move every application to `status` and log the change as an Event.
+
+        Raises InvalidTransition, changing nothing, if any application can't
+        move to `status`. Terminal statuses also set the end date. Statuses are
+        changed with UPDATE and events written with bulk_create, in batches of
+        1000, so no per-object saves or signals are involved. Returns the
+        number of applications changed.
+        """
+        status = ApplicationStatus(status)
+        date = date or timezone.localdate()
+        db = router.db_for_write(self.model)
+        with transaction.atomic(using=db):
+            rows = list(
+                self.using(db)
+                .select_for_update()
+                .values_list("pk", "applicant_id", "status")
+            )
+            for pk, __, current in rows:
+                if status not in STATUS_TRANSITIONS[current]:
+                    raise InvalidTransition(
+                        "Application {} can't change from {} to {}.".format(
+                            pk, ApplicationStatus(current).label, status.label
+                        )
+                    )
+
+            changes = {"status": status}
+            if not STATUS_TRANSITIONS[status]:
+                changes["end_date"] = date
+            for batch in batched(rows, 1000):
+                Application.objects.using(db).filter(
+                    pk__in=[pk for pk, __, __ in batch]
+                ).update(**changes)
+                events = Event.objects.using(db).bulk_create(
+                    Event(
+                        application_id=pk,
+                        description="Status changed from {} to {}.".format(
+                            ApplicationStatus(current).label, status.label
+                        ),
+                        date=date,
+                    )
+                    for pk, __, current in batch
+                )
+                Application.objects.using(db).filter(
+                    pk__in=[pk for pk, __, __ in batch]
+                ).events_added(1, date)
+                SearchDocument.objects.index_events([event.pk for event in events])
+
+            customers_changed({applicant_id for __, applicant_id, __ in rows})
+        return len(rows)
+
+    def add_event(self, description, date=None):
+        """Log the same Event on every application with bulk_create.
+
+        Returns the number of events created.
+        """
+        date = date or timezone.localdate()
+        db = router.db_for_write(self.model)
+        with transaction.atomic(using=db):
+            rows = list(self.using(db).values_list("pk", "applicant_id"))
+            for batch in batched(rows, 1000):
+                events = Event.objects.using(db).bulk_create(
+                    Event(application_id=pk, description=description, date=date)
+                    for pk, __ in batch
+                )
+                Application.objects.using(db).filter(
+                    pk__in=[pk for pk, __ in batch]
+                ).events_added(1, date)
+                SearchDocument.objects.index_events([event.pk for event in events])
+            customers_changed({applicant_id for __, applicant_id in rows}, tags=False)
+        return len(rows)
+
+    def events_added(self, count=1, date=None):
+        """Count `count` new events dated `date` on every application.
+
+        One UPDATE with F-expressions, so concurrent additions aren't lost.
+        """
+        date = models.Value(date or timezone.localdate(), models.DateField())
+        return self.update(
+            event_count=models.F("event_count") + count,
+            last_event_date=Greatest(Coalesce("last_event_date", date), date),
+            last_activity_at=timezone.now(),
+        )
+
+    def events_changed(self):
+        """Update the last event date after events were edited."""
+        return self.update(
+            last_event_date=latest_event_date(), last_activity_at=timezone.now()
+        )
+
+    def events_removed(self, count=1):
+        """Uncount `count` deleted events on every application."""
+        return self.update(
+            event_count=models.F("event_count") - count,
+            last_event_date=latest_event_date(),
+            last_activity_at=timezone.now(),
+        )
+
+    def recount_events(self):
+        """Recompute the event counters of every application from its events.
+
+        The last activity only moves forward, to the last event's date.
+        """
+        counts = (
+            Event.objects.filter(application=models.OuterRef("pk"))
+            .order_by()
+            .values("application")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+        return self.update(
+            event_count=Coalesce(models.Subquery(counts), 0),
+            last_event_date=latest_event_date(),
+            last_activity_at=Greatest(
+                "last_activity_at",
+                Cast(
+                    Coalesce(latest_event_date(), "start_date"),
+                    models.DateTimeField(),
+                ),
+            ),
+        )
+
+    def bulk_delete(self):
+        """Delete the applications, their events and search documents.
+
+        Unlike delete(), which has to fetch every object to send its signals,
+        this issues one DELETE per table for each batch of 1000. Returns the
+        number of applications deleted.
+        """
+        db = router.db_for_write(self.model)
+        with transaction.atomic(using=db):
+            rows = list(self.using(db).values_list("pk", "applicant_id"))
+            for batch in batched([pk for pk, __ in rows], 1000):
+                SearchDocument.objects.using(db).filter(application__in=batch).delete()
+                # delete() would load every event and application to send
+                # post_delete for each; the private _raw_delete() is the only
+                # way to a plain DELETE. Without those signals, the search
+                # documents are deleted above and customers_changed() does
+                # the rest of what the receivers would.
+                Event.objects.filter(application__in=batch)._raw_delete(db)
+                Application.objects.filter(pk__in=batch)._raw_delete(db)
+            customers_changed({applicant_id for __, applicant_id in rows})
+        return len(rows)
+
+
+def latest_event_date():
+    """The date of the latest event of the outer application, or NULL."""
+    return models.Subquery(
+        Event.objects.filter(application=models.OuterRef("pk"))
+        .order_by("-date")
+        .values("date")[:1]
+    )
 
 
 class Application(models.Model):
     applicant = models.ForeignKey(CustomerProfile, on_delete=models.CASCADE)
     position = models.ForeignKey(Position, on_delete=models.CASCADE)
-    start_date = models.DateField(default=timezone.now)
+    start_date = models.DateField(default=timezone.now, db_index=True)
     end_date = models.DateField(null=True)
-    status = models.CharField(
-        max_length=50, choices=APPLICATION_STATUS_CHOICES, default="Open"
+    status = models.SmallIntegerField(
+        choices=ApplicationStatus.choices, default=ApplicationStatus.OPEN
     )
+    # Kept up to date by the Event receivers and the bulk event methods of
+    # ApplicationQuerySet, so the list needn't read the events; rebuilt by the
+    # rebuild_event_counters command.
+    event_count = models.PositiveIntegerField(default=0)
+    last_event_date = models.DateField(null=True)
+    last_activity_at = models.DateTimeField(default=timezone.now)
+
+    objects = ApplicationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Only in-progress applications are listed, so closed ones, which
+            # make up most of a long search history, stay out of the index.
+            models.Index(
+                fields=["applicant", "-last_activity_at", "-id"],
+                condition=models.Q(status__in=ACTIVE_APPLICATION_STATUSES),
+                name="application_active",
+            )
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["applicant", "position"], name="unique_application"
+            )
+        ]
 
     def __str__(self):
-        return "Application to {}: {}".format(self.position, self.status)
+        return "Application to {}: {}".format(self.position, self.get_status_display())
+
+    @property
+    def next_statuses(self):
+        return STATUS_TRANSITIONS[self.status]
+
+    def transition(self, status, date=None):
+        """Move this application to `status`; see ApplicationQuerySet.transition."""
+        Application.objects.filter(pk=self.pk).transition(status, date)
+        self.refresh_from_db(fields=["status", "end_date"])
+
+
+class EventQuerySet(models.QuerySet):
+    def bulk_delete(self):
+        """Delete the events with one DELETE per table for each batch of 1000.
+
+        Returns the number of events deleted.
+        """
+        db = router.db_for_write(self.model)
+        with transaction.atomic(using=db):
+            rows = list(
+                self.using(db).values_list(
+                    "pk", "application_id", "application__applicant_id"
+                )
+            )
+            for batch in batched([pk for pk, __, __ in rows], 1000):
+                SearchDocument.objects.using(db).filter(event__in=batch).delete()
+                # Private, but a plain DELETE; see ApplicationQuerySet.bulk_delete.
+                # The event counters are recounted below instead of by
+                # count_deleted_event.
+                Event.objects.filter(pk__in=batch)._raw_delete(db)
+            application_ids = [application_id for __, application_id, __ in rows]
+            for batch in batched(sorted(set(application_ids)), 1000):
+                Application.objects.using(db).filter(pk__in=batch).recount_events()
+            customers_changed(
+                {applicant_id for __, __, applicant_id in rows}, tags=False
+            )
+        return len(rows)
 
 
 class Event(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE)
     description = models.TextField(max_length=500, null=False)
-    date = models.DateField(default=timezone.now)
+    date = models.DateField(default=timezone.now, db_index=True)
+
+    objects = EventQuerySet.as_manager()
 
     class Meta:
         ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["application", "-date"], name="event_application_date")
+        ]
 
     def __str__(self):
         return "{} for {}".format(self.description, self.application)
+
+
+class TagCountManager(models.Manager):
+    def refresh(self, applicant_ids):
+        """Recount the tags of the given customers' active applications."""
+        applicant_ids = list(applicant_ids)
+        counts = (
+            Application.objects.active()
+            .filter(applicant__in=applicant_ids, position__tags__isnull=False)
+            .values_list("applicant_id", "position__tags")
+            .annotate(count=models.Count("pk"))
+            .order_by()
+        )
+        with transaction.atomic():
+            self.filter(applicant__in=applicant_ids).delete()
+            self.bulk_create(
+                self.model(applicant_id=applicant_id, tag_id=tag_id, count=count)
+                for applicant_id, tag_id, count in counts
+            )
+
+
+class TagCount(models.Model):
+    """Number of a customer's active applications per tag, for faceting."""
+
+    applicant = models.ForeignKey(CustomerProfile, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField()
+
+    objects = TagCountManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["applicant", "tag"], name="unique_tag_count"
+            )
+        ]
+
+
+# Weeks of event history kept in the events-per-week series.
+STATS_WEEKS = 26
+
+
+class ApplicationStatsManager(models.Manager):
+    def refresh(self, applicant_ids):
+        """Recompute the rollups of the given customers.
+
+        Every figure is aggregated by the database, grouped by customer, so a
+        refresh costs the same handful of queries for one customer or many.
+        """
+        applicant_ids = list(
+            CustomerProfile.objects.filter(pk__in=applicant_ids).values_list(
+                "pk", flat=True
+            )
+        )
+        applications = Application.objects.filter(applicant__in=applicant_ids)
+        stats = {
+            applicant_id: self.model(
+                applicant_id=applicant_id,
+                status_counts={},
+                events_per_week=[],
+                salaries=[],
+            )
+            for applicant_id in applicant_ids
+        }
+
+        for applicant_id, status, count in (
+            applications.values_list("applicant_id", "status")
+            .annotate(count=models.Count("pk"))
+            .order_by()
+        ):
+            stats[applicant_id].status_counts[str(status)] = count
+            stats[applicant_id].total += count
+            if status != ApplicationStatus.OPEN:
+                stats[applicant_id].responded += count
+
+        duration = models.ExpressionWrapper(
+            models.F("end_date") - models.F("start_date"),
+            output_field=models.DurationField(),
+        )
+        # Rows in the middle of each customer's durations, ranked in the
+        # database: one for an odd number of applications, two for an even one.
+        middle = (
+            applications.filter(end_date__isnull=False)
+            .annotate(
+                duration=duration,
+                row=models.Window(
+                    RowNumber(),
+                    partition_by="applicant_id",
+                    order_by=[duration.asc(), "pk"],
+                ),
+                ended=models.Window(models.Count("pk"), partition_by="applicant_id"),
+            )
+            .alias(twice_row=models.F("row") * 2)
+            .filter(
+                twice_row__gte=models.F("ended"), twice_row__lte=models.F("ended") + 2
+            )
+            .values_list("applicant_id", "duration")
+        )
+        medians = {}
+        for applicant_id, duration in middle:
+            medians.setdefault(applicant_id, []).append(duration.days)
+        for applicant_id, days in medians.items():
+            stats[applicant_id].median_days = sum(days) / len(days)
+
+        since = timezone.now().date() - timedelta(weeks=STATS_WEEKS)
+        for applicant_id, week, count in (
+            Event.objects.filter(
+                application__applicant__in=applicant_ids, date__gte=since
+            )
+            .annotate(week=TruncWeek("date"))
+            .values_list("application__applicant_id", "week")
+            .annotate(count=models.Count("pk"))
+            .order_by("week")
+        ):
+            stats[applicant_id].events_per_week.append([week.isoformat(), count])
+
+        for applicant_id, sub_industry, *salaries in (
+            applications.values_list("applicant_id", "position__company__sub_industry")
+            .annotate(
+                count=models.Count("pk"),
+                lowest=models.Min("position__min_salary"),
+                average_min=models.Avg("position__min_salary"),
+                average_max=models.Avg("position__max_salary"),
+                highest=models.Max("position__max_salary"),
+            )
+            .order_by("position__company__sub_industry")
+        ):
+            stats[applicant_id].salaries.append([sub_industry] + salaries)
+
+        with transaction.atomic():
+            self.filter(applicant__in=applicant_ids).delete()
+            self.bulk_create(stats.values())
+
+
+class ApplicationStats(models.Model):
+    """Precomputed job-search analytics of a customer, read by the stats page.
+
+    Rows are refreshed in the background, queued by the receivers below when
+    applications and events change, and for every customer by the
+    refresh_stats command.
+    """
+
+    applicant = models.OneToOneField(CustomerProfile, on_delete=models.CASCADE)
+    total = models.PositiveIntegerField(default=0)
+    responded = models.PositiveIntegerField(default=0)
+    median_days = models.FloatField(null=True)
+    # Application count by status code; JSON object keys are strings.
+    status_counts = models.JSONField(default=dict)
+    # [week, count] pairs over the last STATS_WEEKS weeks.
+    events_per_week = models.JSONField(default=list)
+    # [sub_industry, applications, lowest, average min, average max, highest].
+    salaries = models.JSONField(default=list)
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = ApplicationStatsManager()
+
+    class Meta:
+        verbose_name_plural = "Application stats"
+
+    @property
+    def response_rate(self):
+        return self.responded / self.total if self.total else None
+
+    @property
+    def status_breakdown(self):
+        return [
+            (label, self.status_counts.get(str(status), 0))
+            for status, label in ApplicationStatus.choices
+        ]
+
+
+class SearchDocumentManager(models.Manager):
+    def index_applications(self, application_ids):
+        """Rebuild the documents of the given applications."""
+        applications = Application.objects.filter(pk__in=application_ids).values_list(
+            "pk",
+            "applicant_id",
+            "position__company__company_name",
+            "position__company__sub_industry",
+            "position__position_name",
+            "position__tech_stack",
+        )
+        documents = [
+            self.model(
+                applicant_id=applicant_id,
+                application_id=pk,
+                body=" ".join(text for text in texts if text),
+            )
+            for pk, applicant_id, *texts in applications
+        ]
+        with transaction.atomic():
+            self.filter(application__in=application_ids, event=None).delete()
+            self.bulk_create(documents)
+
+    def index_events(self, event_ids):
+        """Rebuild the documents of the given events."""
+        events = Event.objects.filter(pk__in=event_ids).values_list(
+            "pk", "application_id", "application__applicant_id", "description"
+        )
+        documents = [
+            self.model(
+                applicant_id=applicant_id,
+                application_id=application_id,
+                event_id=pk,
+                body=description,
+            )
+            for pk, application_id, applicant_id, description in events
+        ]
+        with transaction.atomic():
+            self.filter(event__in=event_ids).delete()
+            self.bulk_create(documents)
+
+
+class SearchDocument(models.Model):
+    """Searchable text of an application or one of its events.
+
+    The full-text index over `body` is maintained by the database itself (an
+    FTS5 table on SQLite, a tsvector column on PostgreSQL); see search.py.
+    """
+
+    applicant = models.ForeignKey(CustomerProfile, on_delete=models.CASCADE)
+    application = models.ForeignKey(Application, on_delete=models.CASCADE)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True)
+    body = models.TextField()
+
+    objects = SearchDocumentManager()
+
+
+class TaskStatus(models.IntegerChoices):
+    QUEUED = 0, "Queued"
+    RUNNING = 1, "Running"
+    DONE = 2, "Done"
+    FAILED = 3, "Failed"
+
+
+class TaskQuerySet(models.QuerySet):
+    def claim(self, limit, lease):
+        """Lease up to `limit` due tasks for `lease` seconds; return their ids.
+
+        Due tasks are queued ones whose run_at has passed and running ones
+        whose lease ran out, their worker having died; those that died on
+        their last attempt are marked failed instead. Each is taken with a
+        conditional UPDATE, so two workers never claim the same task.
+        """
+        now = timezone.now()
+        lost = models.Q(status=TaskStatus.RUNNING, locked_until__lt=now)
+        out_of_attempts = models.Q(attempts__gte=models.F("max_attempts"))
+        self.filter(lost & out_of_attempts).update(
+            status=TaskStatus.FAILED,
+            error="The worker running the last attempt was lost.",
+            locked_until=None,
+            finished_at=now,
+        )
+        due = (
+            self.filter(
+                models.Q(status=TaskStatus.QUEUED, run_at__lte=now)
+                | (lost & ~out_of_attempts)
+            )
+            .order_by("run_at", "pk")
+            .values_list("pk", "status", "locked_until")[:limit]
+        )
+        claimed = []
+        for pk, status, locked_until in due:
+            if self.filter(pk=pk, status=status, locked_until=locked_until).update(
+                status=TaskStatus.RUNNING,
+                attempts=models.F("attempts") + 1,
+                locked_until=now + timedelta(seconds=lease),
+                started_at=now,
+            ):
+                claimed.append(pk)
+        return claimed
+
+    def release(self):
+        """Requeue running tasks whose worker lost them, without waiting for
+        their leases to expire; those on their last attempt are failed."""
+        now = timezone.now()
+        running = self.filter(status=TaskStatus.RUNNING)
+        out_of_attempts = models.Q(attempts__gte=models.F("max_attempts"))
+        running.filter(out_of_attempts).update(
+            status=TaskStatus.FAILED,
+            error="The worker running the last attempt was lost.",
+            locked_until=None,
+            finished_at=now,
+        )
+        return running.exclude(out_of_attempts).update(
+            status=TaskStatus.QUEUED, locked_until=None, run_at=now
+        )
+
+
+class Task(models.Model):
+    """A unit of background work, run by the run_worker command; see tasks.py."""
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict)
+    # The customer allowed to follow the task, if any.
+    owner = models.ForeignKey(CustomerProfile, on_delete=models.CASCADE, null=True)
+    status = models.SmallIntegerField(
+        choices=TaskStatus.choices, default=TaskStatus.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True)
+    # Items processed so far, out of `total` when that is known.
+    done = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True)
+    result = models.JSONField(null=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_at"], name="task_due")]
+
+    def __str__(self):
+        return "{} #{}: {}".format(self.name, self.pk, self.get_status_display())
+
+    @property
+    def finished(self):
+        return self.status in (TaskStatus.DONE, TaskStatus.FAILED)
+
+    @property
+    def failed(self):
+        return self.status == TaskStatus.FAILED
+
+    @property
+    def percent(self):
+        return 100 * self.done // self.total if self.total else None
+
+
+class ViewTiming(models.Model):
+    """Request totals of one view, summed by InstrumentationMiddleware across
+    every worker process; see instrumentation.py."""
+
+    view = models.CharField(max_length=200, unique=True)
+    requests = models.PositiveBigIntegerField(default=0)
+    queries = models.PositiveBigIntegerField(default=0)
+    duplicate_queries = models.PositiveBigIntegerField(default=0)
+    db_us = models.PositiveBigIntegerField(default=0)
+    template_us = models.PositiveBigIntegerField(default=0)
+    total_us = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return self.view
+
+
+@receiver([post_save, post_delete], sender=CustomerProfile)
+def customer_profile_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: cache.invalidate([instance.user_id]))
+
+
+@receiver([post_save, post_delete], sender=Application)
+def application_changed(sender, instance, **kwargs):
+    invalidate_customers(pk=instance.applicant_id)
+
+
+@receiver([post_save, post_delete], sender=Event)
+def event_changed(sender, instance, **kwargs):
+    invalidate_customers(application=instance.application_id)
+
+
+@receiver(post_save, sender=Event)
+def count_saved_event(sender, instance, created, **kwargs):
+    applications = Application.objects.filter(pk=instance.application_id)
+    if created:
+        applications.events_added(1, instance.date)
+    else:
+        applications.events_changed()
+
+
+@receiver(post_delete, sender=Event)
+def count_deleted_event(sender, instance, origin=None, **kwargs):
+    # Events deleted along with their application or customer need no count.
+    deleted = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    if deleted is Event:
+        Application.objects.filter(pk=instance.application_id).events_removed()
+
+
+@receiver([post_save, post_delete], sender=Position)
+def position_changed(sender, instance, **kwargs):
+    invalidate_customers(application__position=instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Company)
+def company_changed(sender, instance, **kwargs):
+    invalidate_customers(application__position__company=instance.pk)
+
+
+def invalidate_customers(**filters):
+    """Drop the cached fragments of every customer matching `filters`.
+
+    Not until the transaction commits: a request reading the new version
+    before then would cache the old data under it.
+    """
+    user_ids = list(
+        CustomerProfile.objects.filter(**filters)
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    transaction.on_commit(lambda: cache.invalidate(user_ids))
+
+
+def customers_changed(applicant_ids, tags=True):
+    """Do what the signal receivers do, for changes made without signals."""
+    if tags:
+        TagCount.objects.refresh(applicant_ids)
+    refresh_stats_on_commit(applicant_ids)
+    invalidate_customers(pk__in=applicant_ids)
+
+
+@receiver(post_save, sender=Application)
+def application_saved(sender, instance, **kwargs):
+    SearchDocument.objects.index_applications([instance.pk])
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, **kwargs):
+    SearchDocument.objects.index_events([instance.pk])
+
+
+@receiver(post_save, sender=Position)
+def position_saved(sender, instance, **kwargs):
+    reindex_applications(position=instance.pk)
+
+
+@receiver(post_save, sender=Company)
+def company_saved(sender, instance, **kwargs):
+    reindex_applications(position__company=instance.pk)
+
+
+def reindex_applications(**filters):
+    """Rebuild the search documents of every application matching `filters`."""
+    application_ids = (
+        Application.objects.filter(**filters).values_list("pk", flat=True).iterator()
+    )
+    for batch in batched(application_ids, 1000):
+        SearchDocument.objects.index_applications(batch)
+
+
+@receiver([post_save, post_delete], sender=Application)
+def application_tags_changed(sender, instance, **kwargs):
+    TagCount.objects.refresh([instance.applicant_id])
+
+
+@receiver(m2m_changed, sender=Position.tags.through)
+def position_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        applicants = Application.objects.filter(position=instance.pk)
+    elif action == "post_clear":
+        # The cleared positions are gone; recount whoever counted the tag.
+        applicants = TagCount.objects.filter(tag=instance)
+    else:
+        applicants = Application.objects.filter(position__in=pk_set)
+
+    applicant_ids = list(applicants.values_list("applicant_id", flat=True).distinct())
+    TagCount.objects.refresh(applicant_ids)
+    # The counts are shown as facets in the cached applications list.
+    invalidate_customers(pk__in=applicant_ids)
+
+
+def refresh_stats_on_commit(applicant_ids):
+    """Queue a refresh of the customers' rollups once the transaction commits.
+
+    A rollup scans the customer's whole history, so it is left to run_worker
+    instead of slowing down every write, and a customer whose refresh is
+    still queued isn't queued again. Deferring it to the commit keeps it out
+    of cascading deletes, which would otherwise recreate the rows of a
+    customer that is being deleted.
+    """
+    applicant_ids = list(applicant_ids)
+    transaction.on_commit(lambda: queue_stats_refresh(applicant_ids))
+
+
+def queue_stats_refresh(applicant_ids):
+    """Queue tasks.refresh_customer_stats for customers without one queued."""
+    if not applicant_ids:
+        return
+    queued = Task.objects.filter(
+        name="refresh_customer_stats",
+        status=TaskStatus.QUEUED,
+        kwargs__applicant_id__in=applicant_ids,
+    ).values_list("kwargs__applicant_id", flat=True)
+    Task.objects.bulk_create(
+        Task(name="refresh_customer_stats", kwargs={"applicant_id": applicant_id})
+        for applicant_id in set(applicant_ids).difference(queued)
+    )
+
+
+@receiver([post_save, post_delete], sender=Application)
+def application_stats_changed(sender, instance, **kwargs):
+    refresh_stats_on_commit([instance.applicant_id])
+
+
+@receiver([post_save, post_delete], sender=Event)
+def event_stats_changed(sender, instance, **kwargs):
+    refresh_stats_on_commit(
+        Application.objects.filter(pk=instance.application_id).values_list(
+            "applicant_id", flat=True
+        )
+    )
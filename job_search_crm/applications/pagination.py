@@ -0,0 +1,125 @@
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+CURSOR_SEPARATOR = "_"
+# Tables estimated to hold fewer rows than this are counted exactly.
+ESTIMATE_THRESHOLD = 10000
+
+
+class KeysetPaginator:
+    """Paginates a queryset on a tuple of columns, newest first.
+
+    Unlike offset pagination, fetching page N costs the same as fetching
+    page 1: each page is a range scan starting from the last row of the
+    previous page, identified by an opaque cursor string.
+    """
+
+    def __init__(self, queryset, keys, page_size):
+        self.keys = keys
+        self.page_size = page_size
+        self.queryset = queryset.order_by(*("-" + key for key in keys))
+
+    def encode_cursor(self, obj):
+        return CURSOR_SEPARATOR.join(str(getattr(obj, key)) for key in self.keys)
+
+    def decode_cursor(self, cursor):
+        values = cursor.split(CURSOR_SEPARATOR)
+        if len(values) != len(self.keys):
+            raise ValueError("Malformed cursor: {}".format(cursor))
+
+        model = self.queryset.model
+        try:
+            return [
+                model._meta.get_field(key).to_python(value)
+                for key, value in zip(self.keys, values)
+            ]
+        except ValidationError as e:
+            raise ValueError("Malformed cursor: {}".format(cursor)) from e
+
+    def seek(self, values):
+        """Build the filter selecting rows strictly after `values`."""
+        condition = Q()
+        for i, key in enumerate(self.keys):
+            equal = {k: v for k, v in zip(self.keys[:i], values[:i])}
+            condition |= Q(**equal, **{key + "__lt": values[i]})
+        return condition
+
+    def page_queryset(self, cursor):
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(self.seek(self.decode_cursor(cursor)))
+        # One extra row tells whether there is a next page.
+        return queryset[: self.page_size + 1]
+
+    def split(self, items):
+        if len(items) > self.page_size:
+            items = items[: self.page_size]
+            return items, self.encode_cursor(items[-1])
+
+        return items, None
+
+    def page(self, cursor=None):
+        """Return (items, next_cursor); next_cursor is None on the last page."""
+        return self.split(list(self.page_queryset(cursor)))
+
+    async def apage(self, cursor=None):
+        """page() for async views."""
+        return self.split([item async for item in self.page_queryset(cursor)])
+
+
+def estimated_count(model, using):
+    """Return the planner's row estimate for `model`'s table, or None.
+
+    PostgreSQL keeps it in pg_class; SQLite in sqlite_stat1 once ANALYZE has
+    run, see the analyze_database command, as the first number of each
+    index's row. Without statistics, the caller has to count. Partial indexes count only
+    the rows they cover, so the largest is taken. Either is read in constant
+    time, unlike COUNT(*).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [table]
+                )
+            elif connection.vendor == "sqlite":
+                # CAST reads the leading integer of "rows [rows per key...]".
+                cursor.execute(
+                    "SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 "
+                    "WHERE tbl = %s",
+                    [table],
+                )
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 doesn't exist until the first ANALYZE.
+        return None
+
+    if row is None or row[0] is None:
+        return None
+    estimate = int(float(str(row[0]).split()[0]))
+    # PostgreSQL reports -1 for tables that were never analyzed.
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """A Paginator that estimates the size of large unfiltered tables.
+
+    Filtered querysets are still counted exactly; they should be narrowed by
+    an index.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
@@ -0,0 +1,96 @@
+"""Routes reads of the applications app to read replicas.
+
+settings.REPLICA_DATABASES lists the replica aliases. Writes always go to the
+primary database, and so do reads
+- outside a request, e.g. in management commands,
+- inside a transaction on the primary,
+- for REPLICA_PIN_SECONDS after the user's last write, so they see their
+  own changes before replication does (see ReplicaPinMiddleware),
+- when no replica can be reached.
+"""
+
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+APP_LABEL = "applications"
+PIN_COOKIE = "read_primary"
+# Seconds a replica that failed to connect is skipped.
+RETRY_INTERVAL = 30
+
+current = ContextVar("replica_routing", default=None)
+# Replica alias: time.monotonic() until which it is skipped.
+unavailable = {}
+
+
+class RoutingState:
+    """Whether the current request reads from the primary, and whether it wrote."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def available(alias):
+    if time.monotonic() < unavailable.get(alias, 0):
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        logger.warning("Replica %s is unavailable.", alias, exc_info=True)
+        unavailable[alias] = time.monotonic() + RETRY_INTERVAL
+        return False
+    return True
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != APP_LABEL:
+            return None
+
+        state = current.get()
+        pinned = state is not None and state.pinned
+        if pinned or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        # Follow relations on the database their instance was read from.
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db is not None:
+            return instance._state.db
+
+        if state is None:
+            return DEFAULT_DB_ALIAS
+
+        replicas = list(settings.REPLICA_DATABASES)
+        random.shuffle(replicas)
+        for alias in replicas:
+            if available(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != APP_LABEL:
+            return None
+
+        state = current.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas are copies of the primary, schema included.
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Keeps the file-based caches of a test run in a temporary directory.
+
+    Tests clear and fill the caches, which would otherwise wipe a developer's
+    cache and sessions under CACHE_DIR and mix with other test runs.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.caches = override_settings(
+            CACHES={
+                alias: dict(config, LOCATION=os.path.join(self.cache_dir.name, alias))
+                for alias, config in settings.CACHES.items()
+            }
+        )
+        self.caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.caches.disable()
+        self.cache_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
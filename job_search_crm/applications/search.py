@@ -0,0 +1,68 @@
+"""Ranked full-text search over a customer's applications and events.
+
+SearchDocument rows are kept in sync with the models by the receivers in
+models.py. The database indexes them itself: on SQLite through the FTS5
+table and triggers created by migration 0005, on PostgreSQL through a
+generated tsvector column with a GIN index. Other databases fall back to a
+substring scan.
+"""
+
+import re
+
+from django.db import connections
+
+from .models import SearchDocument
+
+RESULTS_LIMIT = 50
+
+SQLITE_SEARCH = """
+    SELECT rowid FROM applications_searchdocument_fts
+    WHERE applications_searchdocument_fts MATCH %s
+    ORDER BY bm25(applications_searchdocument_fts, 1.0, 0.0)
+    LIMIT %s
+"""
+POSTGRESQL_SEARCH = """
+    SELECT id FROM applications_searchdocument,
+        plainto_tsquery('english', %s) query
+    WHERE applicant_id = %s AND body_vector @@ query
+    ORDER BY ts_rank(body_vector, query) DESC
+    LIMIT %s
+"""
+
+
+def terms(query):
+    return re.findall(r"\w+", query)
+
+
+def fts5_expression(profile, query):
+    """Quote every term, so user input can't inject FTS5 query syntax."""
+    phrases = " ".join('"{}"'.format(term) for term in terms(query))
+    return 'applicant_id : "{}" AND body : ({})'.format(profile.pk, phrases)
+
+
+def ranked_ids(profile, query, limit):
+    connection = connections[SearchDocument.objects.db]
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(SQLITE_SEARCH, [fts5_expression(profile, query), limit])
+        elif connection.vendor == "postgresql":
+            cursor.execute(POSTGRESQL_SEARCH, [query, profile.pk, limit])
+        else:
+            documents = SearchDocument.objects.filter(applicant=profile)
+            for term in terms(query):
+                documents = documents.filter(body__icontains=term)
+            return list(documents.values_list("pk", flat=True)[:limit])
+
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search(profile, query, limit=RESULTS_LIMIT):
+    """Return the profile's search documents matching `query`, best first."""
+    if not terms(query):
+        return []
+
+    ids = ranked_ids(profile, query, limit)
+    documents = SearchDocument.objects.select_related(
+        "application__position__company", "event"
+    ).in_bulk(ids)
+    return [documents[pk] for pk in ids if pk in documents]
@@ -0,0 +1,176 @@
+"""Synthetic CRM data for benchmarks.
+
+Rows are generated lazily and written with bulk_create in fixed-size batches,
+so seeding millions of rows runs in constant memory.
+"""
+
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import (
+    Application,
+    ApplicationStatus,
+    Company,
+    CustomerProfile,
+    Event,
+    Position,
+    Tag,
+    parse_tags,
+)
+from .utils import batched
+
+SUB_INDUSTRIES = ("Software", "Fintech", "Healthcare", "Retail", "Gaming", "Security")
+TECH_STACKS = (
+    "Python, Django, PostgreSQL",
+    "Rust, Tokio",
+    "Go, Kubernetes",
+    "Java, Spring",
+    "TypeScript, React, Node",
+)
+EVENT_DESCRIPTIONS = (
+    "Applied online.",
+    "Phone screen with recruiter.",
+    "Technical interview.",
+    "Onsite interview.",
+    "Followed up by email.",
+)
+START = date(2015, 1, 1)
+DAYS = 365 * 4
+
+
+def write(model, rows, using, batch_size):
+    """bulk_create `rows` in batches, one transaction per batch; return the pks."""
+    pks = []
+    for batch in batched(rows, batch_size):
+        with transaction.atomic(using=using):
+            created = model.objects.using(using).bulk_create(batch)
+        pks.extend(obj.pk for obj in created)
+    return pks
+
+
+def seed(
+    users,
+    applications_per_user,
+    events_per_application=0,
+    companies=1000,
+    using=DEFAULT_DB_ALIAS,
+    batch_size=5000,
+    prefix="bench",
+    rng=None,
+):
+    """Create `users` customers, each with their own applications and events.
+
+    Every customer applies to distinct positions, so the data satisfies the
+    one-application-per-position constraint. Positions are tagged, but the
+    rows derived by signal receivers (tag counts, stats and search documents)
+    are left for the caller to build. Returns the number of rows made.
+    """
+    rng = rng or random.Random(0)
+    statuses = ApplicationStatus.values
+
+    user_pks = write(
+        User,
+        (
+            User(username="{}{}".format(prefix, i), password="!", is_active=True)
+            for i in range(users)
+        ),
+        using,
+        batch_size,
+    )
+    profile_pks = write(
+        CustomerProfile,
+        (CustomerProfile(user_id=pk) for pk in user_pks),
+        using,
+        batch_size,
+    )
+    company_pks = write(
+        Company,
+        (
+            Company(
+                company_name="{} Company {}".format(prefix, i),
+                location="City, State",
+                sub_industry=rng.choice(SUB_INDUSTRIES),
+            )
+            for i in range(companies)
+        ),
+        using,
+        batch_size,
+    )
+    tech_stacks = [
+        rng.choice(TECH_STACKS) for __ in range(max(applications_per_user, companies))
+    ]
+    position_pks = write(
+        Position,
+        (
+            Position(
+                company_id=company_pks[i % len(company_pks)],
+                position_name="Engineer {}".format(i),
+                is_remote=rng.random() < 0.3,
+                min_salary=50000 + 1000 * (i % 50),
+                max_salary=90000 + 1000 * (i % 50),
+                tech_stack=tech_stack,
+            )
+            for i, tech_stack in enumerate(tech_stacks)
+        ),
+        using,
+        batch_size,
+    )
+    names = {name for tech_stack in TECH_STACKS for name in parse_tags(tech_stack)}
+    Tag.objects.using(using).bulk_create(
+        [Tag(name=name) for name in names], ignore_conflicts=True
+    )
+    tag_pks = dict(
+        Tag.objects.using(using).filter(name__in=names).values_list("name", "pk")
+    )
+    PositionTag = Position.tags.through
+    position_tags = write(
+        PositionTag,
+        (
+            PositionTag(position_id=pk, tag_id=tag_pks[name])
+            for pk, tech_stack in zip(position_pks, tech_stacks)
+            for name in parse_tags(tech_stack)
+        ),
+        using,
+        batch_size,
+    )
+
+    def applications():
+        for profile_pk in profile_pks:
+            offset = rng.randrange(len(position_pks))
+            for i in range(applications_per_user):
+                start_date = START + timedelta(days=rng.randrange(DAYS))
+                yield Application(
+                    applicant_id=profile_pk,
+                    position_id=position_pks[(offset + i) % len(position_pks)],
+                    start_date=start_date,
+                    status=rng.choice(statuses),
+                    last_activity_at=datetime.combine(
+                        start_date, datetime.min.time(), timezone.utc
+                    ),
+                )
+
+    created = (
+        len(user_pks) * 2 + len(company_pks) + len(position_pks) + len(position_tags)
+    )
+    for batch in batched(applications(), batch_size):
+        with transaction.atomic(using=using):
+            batch = Application.objects.using(using).bulk_create(batch)
+            events = [
+                Event(
+                    application_id=application.pk,
+                    description=rng.choice(EVENT_DESCRIPTIONS),
+                    date=application.start_date + timedelta(days=rng.randrange(90)),
+                )
+                for application in batch
+                for __ in range(events_per_application)
+            ]
+            Event.objects.using(using).bulk_create(events, batch_size=batch_size)
+            Application.objects.using(using).filter(
+                pk__in=[application.pk for application in batch]
+            ).recount_events()
+        created += len(batch) + len(events)
+
+    return created
@@ -0,0 +1,174 @@
+"""Background tasks, queued as Task rows and run by the run_worker command.
+
+Views enqueue work that shouldn't hold a web worker, such as imports and full
+exports, and redirect to a page that polls the task's progress. The worker
+leases due tasks with conditional UPDATEs, so no broker is needed, and runs
+them in a pool of processes. A failed task is retried with exponential
+backoff until it runs out of attempts; a task whose worker died is run again
+once its lease expires. Files handed to or produced by tasks are kept under
+TASK_FILES_DIR.
+"""
+
+import codecs
+import io
+import logging
+import os
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.utils import timezone
+
+from . import exports, imports
+from .models import ApplicationStats, CustomerProfile, Task, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+# Seconds between progress writes; each also renews the task's lease.
+PROGRESS_INTERVAL = 1
+# Management commands that may be queued with enqueue_task.
+COMMANDS = (
+    "analyze_database",
+    "clearsessions",
+    "rebuild_event_counters",
+    "rebuild_search_index",
+    "refresh_stats",
+)
+
+
+def task(function):
+    """Register `function` as a task, called with a Progress and the kwargs."""
+    registry[function.__name__] = function
+    return function
+
+
+def enqueue(name, owner=None, **kwargs):
+    """Queue the task `name`; kwargs must be JSON serializable."""
+    if name not in registry:
+        raise ValueError("Unknown task: {}".format(name))
+    return Task.objects.create(name=name, owner=owner, kwargs=kwargs)
+
+
+def storage():
+    return FileSystemStorage(location=settings.TASK_FILES_DIR)
+
+
+class Progress:
+    """Records how far a running task got, at most every PROGRESS_INTERVAL."""
+
+    def __init__(self, task_id, lease):
+        self.task_id = task_id
+        self.lease = lease
+        self.written = 0.0
+
+    def __call__(self, done, total=None):
+        if time.monotonic() - self.written < PROGRESS_INTERVAL:
+            return
+        changes = {
+            "done": done,
+            "locked_until": timezone.now() + timedelta(seconds=self.lease),
+        }
+        if total is not None:
+            changes["total"] = total
+        Task.objects.filter(pk=self.task_id).update(**changes)
+        self.written = time.monotonic()
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.TASK_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def run(task_id, lease=None):
+    """Run a claimed task and record its outcome; return its new status."""
+    lease = lease or settings.TASK_LEASE_SECONDS
+    task = Task.objects.get(pk=task_id)
+    try:
+        result = registry[task.name](Progress(task.pk, lease), **task.kwargs)
+    except Exception:
+        logger.exception("Task %s failed", task)
+        changes = {"error": traceback.format_exc(), "locked_until": None}
+        if task.attempts < task.max_attempts:
+            changes.update(
+                status=TaskStatus.QUEUED,
+                run_at=timezone.now() + retry_delay(task.attempts),
+            )
+        else:
+            changes.update(status=TaskStatus.FAILED, finished_at=timezone.now())
+    else:
+        changes = {
+            "status": TaskStatus.DONE,
+            "result": result,
+            "error": "",
+            "locked_until": None,
+            "finished_at": timezone.now(),
+        }
+    Task.objects.filter(pk=task.pk).update(**changes)
+    return changes["status"]
+
+
+def counted(items, progress, total):
+    for done, item in enumerate(items):
+        progress(done, total)
+        yield item
+
+
+@task
+def import_applications(progress, profile_id, path, format):
+    profile = CustomerProfile.objects.get(pk=profile_id)
+    with storage().open(path, "rb") as f:
+        result = imports.import_applications(
+            profile, codecs.iterdecode(f, "utf-8-sig"), format, progress=progress
+        )
+    # Kept until the import succeeds, as a retry reads it again; rows
+    # imported by a failed attempt are then skipped as duplicates.
+    storage().delete(path)
+    return {
+        "created": result.created,
+        "duplicates": result.duplicates,
+        "invalid": result.invalid,
+        "errors": result.errors,
+    }
+
+
+@task
+def export_applications(progress, profile_id, format):
+    applications = exports.export_queryset(CustomerProfile.objects.get(pk=profile_id))
+    total = applications.count()
+    applications = counted(
+        applications.iterator(chunk_size=exports.CHUNK_SIZE), progress, total
+    )
+    if format == "csv":
+        lines = exports.export_csv(applications)
+    else:
+        lines = exports.export_ndjson(applications)
+
+    path = "exports/{}.{}".format(uuid.uuid4().hex, format)
+    os.makedirs(os.path.dirname(storage().path(path)), exist_ok=True)
+    with open(storage().path(path), "w", encoding="utf-8", newline="") as f:
+        f.writelines(lines)
+    return {"path": path, "format": format, "applications": total}
+
+
+@task
+def refresh_customer_stats(progress, applicant_id):
+    ApplicationStats.objects.refresh([applicant_id])
+
+
+@task
+def management_command(progress, command):
+    if command not in COMMANDS:
+        raise ValueError("Command {} can't be queued.".format(command))
+    out = io.StringIO()
+    call_command(command, stdout=out)
+    return {"output": out.getvalue()}
+
+
+def save_upload(upload):
+    """Store an uploaded file for a task and return its path."""
+    name = "imports/{}{}".format(uuid.uuid4().hex, os.path.splitext(upload.name)[1])
+    return storage().save(name, upload)
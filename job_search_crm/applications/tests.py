@@ -1,9 +1,146 @@
-from datetime import datetime
-
+import codecs
+import csv
+import functools
+import io
+import json
+import os
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import get_hasher, get_hashers, make_password
 from django.contrib.auth.models import User
-from django.test import TestCase, TransactionTestCase
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+from django.template import Engine
+from django.template.loaders.cached import Loader as CachedLoader
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from django.utils import timezone
+
+from . import cache as fragment_cache, instrumentation, routers, tasks
+from .models import (
+    Application,
+    ApplicationStats,
+    ApplicationStatus,
+    Company,
+    CustomerProfile,
+    Event,
+    InvalidTransition,
+    Position,
+    SearchDocument,
+    Tag,
+    TagCount,
+    Task,
+    TaskStatus,
+)
+from .pagination import estimated_count
+
+
+def streamed(response):
+    """Return the body of a streaming response, from a sync or async iterator."""
+    if not response.is_async:
+        return b"".join(response.streaming_content)
+
+    async def join():
+        return b"".join([part async for part in response.streaming_content])
+
+    return async_to_sync(join)()
+
+
+class QueryBudgetMixin:
+    """Assertions bounding the number of queries a view may run.
+
+    assertQueryBudget runs a request, lets the test add rows and runs it
+    again: both runs must stay within the budget and run the same number of
+    queries, so a view that queries once per application or event fails
+    whatever the budget.
+    """
+
+    def assertWithinBudget(self, context, budget, exact=False):
+        if len(context) > budget or exact and len(context) < budget:
+            self.fail(
+                "{} queries executed, {} {} expected.\nQueries:\n{}".format(
+                    len(context),
+                    "exactly" if exact else "at most",
+                    budget,
+                    "\n".join(query["sql"] for query in context.captured_queries),
+                )
+            )
+
+    @contextmanager
+    def assertMaxQueries(self, budget):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        self.assertWithinBudget(context, budget)
+
+    def count_queries(self, request):
+        """Run `request()` uncached, rolling back what it writes.
+
+        Work deferred to the commit is run and counted too.
+        """
+        fragment_cache.invalidate(User.objects.values_list("pk", flat=True))
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = request()
+                    if response.streaming:
+                        streamed(response)
+            self.assertLess(response.status_code, 500)
+            transaction.set_rollback(True)
+        return context
+
+    def assertQueryBudget(self, budget, request, grow=None):
+        small = self.count_queries(request)
+        self.assertWithinBudget(small, budget)
+        if grow is not None:
+            grow()
+            large = self.count_queries(request)
+            self.assertWithinBudget(large, budget)
+            self.assertEqual(
+                len(small), len(large), "The query count grows with the data."
+            )
+
+
+def run_tasks():
+    """Run every due background task in this process."""
+    call_command("run_worker", processes=0, once=True, stdout=io.StringIO())
+
+
+class TaskFilesMixin:
+    """Keep the files of background tasks in a temporary directory."""
 
-from .models import (Application, Company, CustomerProfile, Event, Position)
+    def setUp(self):
+        super().setUp()
+        files = tempfile.TemporaryDirectory()
+        self.addCleanup(files.cleanup)
+        self.task_files = files.name
+        settings = override_settings(TASK_FILES_DIR=files.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+def query_budget(budget):
+    """Fail the decorated QueryBudgetMixin test if it runs over `budget` queries."""
+
+    def decorator(test):
+        @functools.wraps(test)
+        def wrapper(self, *args, **kwargs):
+            with self.assertMaxQueries(budget):
+                return test(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 
 class IndexTests(TestCase):
@@ -36,6 +173,33 @@ class IndexTests(TestCase):
         self.assertEqual(resp.status_code, 405)
 
 
+class CustomerProfileMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        User.objects.create_user("jane", "jane@email.com", "password")
+        CustomerProfile.objects.create(user=user, bio="A simple man")
+
+    def test_profile_is_loaded_with_the_user(self):
+        self.client.login(username="joe", password="password")
+        # User with profile; the session is read from the cache.
+        with self.assertNumQueries(1):
+            resp = self.client.get("/accounts/profile")
+        self.assertEqual(resp.wsgi_request.customer.bio, "A simple man")
+
+    def test_views_requiring_a_profile_redirect_without_one(self):
+        self.client.login(username="jane", password="password")
+        for url in ("/accounts/profile", "/applications/new", "/applications/export"):
+            resp = self.client.get(url)
+            self.assertRedirects(resp, "/accounts/register/profile")
+
+    def test_views_requiring_a_profile_still_require_login(self):
+        resp = self.client.get("/accounts/profile")
+        self.assertRedirects(resp, "/?next=/accounts/profile")
+
+
 class CreateAccountTests(TransactionTestCase):
 
     def test_create_account_get(self):
@@ -144,8 +308,37 @@ class LoginTests(TestCase):
         )
         self.assertEqual(resp.status_code, 302)
 
+    def test_login_rehashes_passwords_of_other_hashers(self):
+        older_hasher = get_hashers()[-1]
+        User.objects.filter(username="joe").update(
+            password=make_password("password", hasher=older_hasher.algorithm)
+        )
+        self.client.post("/accounts/login", {"username": "joe", "password": "password"})
+        user = User.objects.get(username="joe")
+        self.assertTrue(user.password.startswith(get_hasher().algorithm + "$"))
+        self.assertTrue(user.check_password("password"))
+
+    def test_logout_ends_the_session_in_every_process(self):
+        self.client.login(username="joe", password="password")
+        key = self.client.session.cache_key
+        # The sessions cache as another worker process opens it.
+        other_process = caches.create_connection("sessions")
+        self.assertIsNotNone(other_process.get(key))
+        self.client.get("/accounts/logout")
+        self.assertIsNone(other_process.get(key))
+
+    def test_calibrate_password_hasher(self):
+        out = io.StringIO()
+        with mock.patch("applications.hashers.settings.PASSWORD_HASHER", "pbkdf2"):
+            call_command(
+                "calibrate_password_hasher", target_ms=1, start=1000, stdout=out
+            )
+        self.assertRegex(
+            out.getvalue(), r"^PASSWORD_HASHER_COST=\d+ \(pbkdf2 iterations"
+        )
+
 
-class RestrictedViewsTests(TestCase):
+class RestrictedViewsTests(QueryBudgetMixin, TestCase):
 
     @classmethod
     def setUpClass(cls):
@@ -179,12 +372,14 @@ class RestrictedViewsTests(TestCase):
         ]
 
     def setUp(self):
+        cache.clear()
         self.client.login(username="joe", password="password")
 
     def test_user_can_see_own_application(self):
         resp = self.client.get("/applications/1")
         self.assertEqual(resp.status_code, 200)
 
+    @query_budget(4)
     def test_user_cannot_see_others_applications(self):
         resp = self.client.get("/applications/2")
         self.assertEqual(resp.status_code, 302)
@@ -194,6 +389,11 @@ class RestrictedViewsTests(TestCase):
         event = Event.objects.get(pk=1)
         self.assertIsNotNone(event)
 
+    def test_user_cannot_delete_other_events_by_id(self):
+        resp = self.client.delete("/applications/2/events/2")
+        self.assertEqual(resp.status_code, 404)
+        self.assertTrue(Event.objects.filter(pk=2).exists())
+
     def test_user_can_delete_own_events(self):
         resp = self.client.delete("/applications/1/events/1")
         with self.assertRaises(Event.DoesNotExist):
@@ -207,6 +407,26 @@ class RestrictedViewsTests(TestCase):
         with self.assertRaises(Event.DoesNotExist):
             Event.objects.get(pk=3)
 
+    def test_user_can_create_events(self):
+        resp = self.client.get("/applications/1/events")
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.post(
+            "/applications/1/events",
+            {"description": "Initial phone screening.", "date": "2018-05-01"},
+        )
+        self.assertRedirects(resp, "/applications/1")
+        self.assertTrue(
+            Event.objects.filter(application=1, date=date(2018, 5, 1)).exists()
+        )
+
+    @query_budget(3)
+    def test_user_cannot_post_events_for_others(self):
+        resp = self.client.post(
+            "/applications/2/events",
+            {"description": "Initial phone screening.", "date": "2018-05-01"},
+        )
+        self.assertEqual(resp.status_code, 404)
+
 
 class ProfileViewTests(TestCase):
 
@@ -250,6 +470,29 @@ class ProfileViewTests(TestCase):
         )
         user = User.objects.get(pk=1)
         self.assertTrue(user.check_password("better_password"))
+        # The session stays logged in.
+        resp = self.client.get("/accounts/profile")
+        self.assertEqual(resp.status_code, 200)
+
+    def test_profile_update_saves_only_changed_fields_without_hashing(self):
+        self.client.login(username="joe", password="password")
+        with mock.patch.object(User, "check_password") as check_password:
+            with CaptureQueriesContext(connection) as context:
+                self.client.post(
+                    "/accounts/profile",
+                    {"first_name": "Joe", "bio": "Trying to be anonymous."},
+                )
+        check_password.assert_not_called()
+        updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("UPDATE")
+            and "django_session" not in query["sql"]
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertRegex(
+            updates[0], r'^UPDATE "applications_customerprofile" SET "bio" = .* WHERE'
+        )
 
     def test_password_will_not_be_changed_if_matches_old_password(self):
         self.client.login(username="joe", password="password")
@@ -283,7 +526,7 @@ class ProfileViewTests(TestCase):
         self.assertEquals(user.first_name, "Joe")
 
 
-class ApplicationsViewTests(TestCase):
+class ApplicationsViewTests(QueryBudgetMixin, TestCase):
 
     @classmethod
     def setUpClass(cls):
@@ -294,6 +537,9 @@ class ApplicationsViewTests(TestCase):
             user=user, bio="A simple man", location="Baltimore, MD"
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_get_applications_cannot_be_seen_without_profile(self):
         self.client.login(username="jane", password="password")
         resp = self.client.get("/applications")
@@ -346,13 +592,106 @@ class ApplicationsViewTests(TestCase):
             tech_stack="Python",
         )
         Application.objects.create(
-            applicant=profile, position=position, status="Declined by employer"
+            applicant=profile,
+            position=position,
+            status=ApplicationStatus.DECLINED_BY_EMPLOYER,
         )
 
         self.client.login(username="joe", password="password")
         resp = self.client.get("/applications")
         self.assertIn("You have no open applications right now.", resp.content.decode())
 
+    def create_open_applications(self, count):
+        profile = CustomerProfile.objects.get(user__username="joe")
+        company = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+        for i in range(count):
+            position = Position.objects.create(
+                company=company,
+                position_name="Engineer {}".format(i),
+                is_remote=False,
+                min_salary=50000,
+                max_salary=60000,
+            )
+            Application.objects.create(
+                applicant=profile, position=position, start_date=date(2018, 4, i + 1)
+            )
+
+    def test_get_applications_is_paginated_newest_first(self):
+        self.create_open_applications(3)
+        self.client.login(username="joe", password="password")
+        with mock.patch("applications.views.APPLICATIONS_PAGE_SIZE", 2):
+            resp = self.client.get("/applications")
+            applications = resp.context["applications_list"]
+            self.assertEqual(
+                [a.position.position_name for a in applications],
+                ["Engineer 2", "Engineer 1"],
+            )
+
+            resp = self.client.get(
+                "/applications", {"after": resp.context["next_cursor"]}
+            )
+            applications = resp.context["applications_list"]
+            self.assertEqual(
+                [a.position.position_name for a in applications], ["Engineer 0"]
+            )
+            self.assertIsNone(resp.context["next_cursor"])
+
+    def test_get_applications_with_malformed_cursor_redirects(self):
+        self.client.login(username="joe", password="password")
+        resp = self.client.get("/applications", {"after": "yesterday"})
+        self.assertRedirects(resp, "/applications")
+
+    def test_get_applications_query_count_does_not_grow(self):
+        self.create_open_applications(1)
+        self.client.login(username="joe", password="password")
+        # User with profile, one joined query for the page and the precomputed
+        # tag counts.
+        self.assertQueryBudget(
+            3,
+            lambda: self.client.get("/applications"),
+            grow=lambda: self.create_open_applications(10),
+        )
+
+    def test_active_applications_use_partial_index(self):
+        plan = (
+            Application.objects.active()
+            .filter(applicant_id=1)
+            .order_by("-last_activity_at", "-id")
+            .explain()
+        )
+        self.assertIn("application_active", plan)
+
+    def test_partial_index_matches_status_codes(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'application_active'"
+            )
+            (sql,) = cursor.fetchone()
+        self.assertTrue(sql.endswith('WHERE "status" IN (0, 2)'), sql)
+
+    def test_get_applications_is_served_from_cache(self):
+        self.create_open_applications(2)
+        self.client.login(username="joe", password="password")
+        self.client.get("/applications")
+        # User only.
+        with self.assertNumQueries(1):
+            resp = self.client.get("/applications")
+        self.assertIn("Engineer 1", resp.content.decode())
+
+    def test_get_applications_cache_is_invalidated_by_changes(self):
+        self.create_open_applications(1)
+        self.client.login(username="joe", password="password")
+        self.client.get("/applications")
+        Company.objects.update(company_name="Other")
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.get().save()
+        resp = self.client.get("/applications")
+        self.assertIn("Engineer 0 at Other", resp.content.decode())
+
 
 class NewApplicationViewTests(TestCase):
 
@@ -422,8 +761,28 @@ class NewApplicationViewTests(TestCase):
         applications = Application.objects.all()
         self.assertEquals(len(applications), 0)
 
+    def test_post_new_applications_view_rejects_duplicate_application(self):
+        self.client.login(username="joe", password="password")
+        data = {
+            "company_name": "Company, Inc.",
+            "company_location": "Baltimore, MD",
+            "company_sub_industry": "Widgets",
+            "position_name": "Software Engineer",
+            "is_remote": False,
+            "min_salary": 50000,
+            "max_salary": 60000,
+            "tech_stack": "Python",
+        }
+        self.client.post("/applications/new", data)
+        resp = self.client.post("/applications/new", data)
+        self.assertIn(
+            "This application already exists.",
+            [str(message) for message in resp.context["messages"]],
+        )
+        self.assertEquals(Application.objects.count(), 1)
+
 
-class ApplicationByIdViewTests(TestCase):
+class ApplicationByIdViewTests(QueryBudgetMixin, TestCase):
 
     @classmethod
     def setUpClass(cls):
@@ -447,6 +806,9 @@ class ApplicationByIdViewTests(TestCase):
         )
         application = Application.objects.create(applicant=profile, position=position)
 
+    def setUp(self):
+        cache.clear()
+
     def test_get_application_by_id_view_requires_login(self):
         resp = self.client.get("/applications/1")
         self.assertRedirects(resp, "/?next=/applications/1")
@@ -456,7 +818,1698 @@ class ApplicationByIdViewTests(TestCase):
         resp = self.client.get("/applications/1")
         self.assertIn("Application to Company, Inc.", resp.content.decode())
 
+    def test_get_application_by_id_cache_is_invalidated_by_new_event(self):
+        self.client.login(username="joe", password="password")
+        self.client.get("/applications/1")
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(application_id=1, description="Phone screen.")
+        resp = self.client.get("/applications/1")
+        self.assertIn("Phone screen.", resp.content.decode())
+
+    def test_fragments_are_dropped_once_changes_commit(self):
+        user_id = User.objects.get(username="joe").pk
+        version = fragment_cache.user_version(user_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(application_id=1, description="Phone screen.")
+            self.assertEqual(fragment_cache.user_version(user_id), version)
+        self.assertNotEqual(fragment_cache.user_version(user_id), version)
+
+    def test_fragment_cache_stats_requires_staff(self):
+        self.client.login(username="joe", password="password")
+        resp = self.client.get("/stats/cache")
+        self.assertEqual(resp.status_code, 302)
+
+        User.objects.filter(username="joe").update(is_staff=True)
+        fragment_cache.counts.take()
+        self.client.get("/applications/1")
+        self.client.get("/applications/1")
+        resp = self.client.get("/stats/cache")
+        self.assertEqual(resp.json()["hits"], 1)
+        self.assertEqual(resp.json()["hit_rate"], 0.5)
+
+    def test_lookups_are_counted_without_cache_writes(self):
+        self.client.login(username="joe", password="password")
+        fragment_cache.counts.take()
+        self.client.get("/applications/1")
+        with mock.patch.object(fragment_cache, "flush") as flush:
+            self.client.get("/applications/1")
+        flush.assert_not_called()
+        self.assertEqual(fragment_cache.counts.pending["hit"], 1)
+
+    def test_get_application_by_id_query_count_does_not_grow(self):
+        self.client.login(username="joe", password="password")
+        # User with profile, application with position and company, and one
+        # page of events.
+        self.assertQueryBudget(
+            3,
+            lambda: self.client.get("/applications/1"),
+            grow=lambda: Event.objects.bulk_create(
+                Event(application_id=1, description="Event {}".format(i))
+                for i in range(20)
+            ),
+        )
+        resp = self.client.get("/applications/1")
+        self.assertIn("Event 19", resp.content.decode())
+
+    def test_get_application_by_id_paginates_events(self):
+        Event.objects.bulk_create(
+            Event(application_id=1, description="Event {}".format(i)) for i in range(3)
+        )
+        self.client.login(username="joe", password="password")
+        with mock.patch("applications.views.EVENTS_PAGE_SIZE", 2):
+            resp = self.client.get("/applications/1")
+            self.assertEqual(
+                [event.description for event in resp.context["events"]],
+                ["Event 2", "Event 1"],
+            )
+            resp = self.client.get(
+                "/applications/1", {"events_after": resp.context["next_events_cursor"]}
+            )
+            self.assertEqual(
+                [event.description for event in resp.context["events"]], ["Event 0"]
+            )
+
+    def test_get_application_by_id_without_events(self):
+        self.client.login(username="joe", password="password")
+        resp = self.client.get("/applications/1")
+        self.assertIn("No events so far.", resp.content.decode())
+
+    def test_get_missing_application_by_id(self):
+        self.client.login(username="joe", password="password")
+        resp = self.client.get("/applications/99")
+        self.assertEqual(resp.status_code, 404)
+
     def test_post_application_by_id_not_allowed(self):
         self.client.login(username="joe", password="password")
         resp = self.client.post("/applications/1")
         self.assertEquals(resp.status_code, 405)
+
+
+class ImportApplicationsTests(TaskFilesMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        CustomerProfile.objects.create(user=user)
+        Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username="joe", password="password")
+
+    def test_import_csv_reuses_companies_and_positions(self):
+        upload = SimpleUploadedFile(
+            "applications.csv",
+            b"company_name,company_location,company_sub_industry,position_name,"
+            b"is_remote,min_salary,max_salary,tech_stack,start_date,status\n"
+            b"Company Inc.,Baltimore MD,Widgets,Engineer,false,1,2,Python,,\n"
+            b"Company Inc.,Baltimore MD,Widgets,Manager,true,1,2,,2018-04-01,2\n"
+            b'"Company, Inc.",Baltimore MD,Widgets,Engineer,no,1,2,,,Open\n'
+            b"Company Inc.,Baltimore MD,Widgets,Engineer,false,1,2,Python,,\n",
+        )
+        resp = self.client.post("/applications/import", {"file": upload})
+        task = Task.objects.get()
+        self.assertRedirects(resp, "/tasks/{}".format(task.pk))
+        self.assertFalse(Application.objects.exists())
+
+        run_tasks()
+        self.assertEqual(Company.objects.count(), 2)
+        self.assertEqual(Position.objects.count(), 3)
+        self.assertEqual(Application.objects.count(), 3)
+
+        application = Application.objects.get(position__position_name="Manager")
+        self.assertEqual(application.status, ApplicationStatus.OFFER_EXTENDED)
+        self.assertEqual(application.start_date, date(2018, 4, 1))
+        self.assertTrue(application.position.is_remote)
+
+    def test_import_ndjson_reports_invalid_rows(self):
+        upload = SimpleUploadedFile(
+            "applications.ndjson",
+            b'{"company_name": "Acme", "company_location": "Baltimore, MD", '
+            b'"company_sub_industry": "Widgets", "position_name": "Engineer", '
+            b'"min_salary": 1, "max_salary": 2}\n'
+            b'{"company_name": "Acme", "position_name": "Manager"}\n'
+            b"not json\n",
+        )
+        resp = self.client.post("/applications/import", {"file": upload}, follow=True)
+        self.assertContains(resp, "Waiting for a worker.")
+        self.assertContains(resp, '<meta http-equiv="refresh"')
+
+        run_tasks()
+        resp = self.client.get(resp.wsgi_request.path)
+        self.assertContains(
+            resp, "Imported 1 applications (0 duplicates, 2 invalid rows)."
+        )
+        self.assertContains(resp, "Line 3: Not a JSON object.")
+        self.assertNotContains(resp, '<meta http-equiv="refresh"')
+        self.assertEqual(Application.objects.count(), 1)
+        # The upload is deleted once imported.
+        self.assertEqual(os.listdir(os.path.join(self.task_files, "imports")), [])
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write(
+                "company_name,company_location,company_sub_industry,position_name,"
+                "min_salary,max_salary\n"
+                "Acme,Baltimore MD,Widgets,Engineer,1,2\n"
+            )
+            f.flush()
+            out = io.StringIO()
+            call_command("import_applications", f.name, user="joe", stdout=out)
+        self.assertIn("Imported 1 applications", out.getvalue())
+
+    def test_import_csv_saved_by_excel(self):
+        csv_text = (
+            "company_name,company_location,company_sub_industry,position_name,"
+            "min_salary,max_salary\n"
+            "Acme,Baltimore MD,Widgets,Engineer,1,2\n"
+        )
+        upload = SimpleUploadedFile(
+            "applications.csv", codecs.BOM_UTF8 + csv_text.encode()
+        )
+        self.client.post("/applications/import", {"file": upload})
+        run_tasks()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8-sig") as f:
+            f.write(csv_text.replace("Engineer", "Manager"))
+            f.flush()
+            call_command(
+                "import_applications", f.name, user="joe", stdout=io.StringIO()
+            )
+        self.assertEqual(
+            sorted(
+                Application.objects.values_list("position__position_name", flat=True)
+            ),
+            ["Engineer", "Manager"],
+        )
+
+
+class ExportApplicationsTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        profile = CustomerProfile.objects.create(user=user)
+        company = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+        for name in ("Engineer", "Manager", "Designer"):
+            position = Position.objects.create(
+                company=company,
+                position_name=name,
+                is_remote=False,
+                min_salary=50000,
+                max_salary=60000,
+                tech_stack="Python",
+            )
+            application = Application.objects.create(
+                applicant=profile, position=position, start_date=date(2018, 4, 1)
+            )
+        Event.objects.create(
+            application=application, description="Applied.", date=date(2018, 4, 1)
+        )
+        Event.objects.create(
+            application=application, description="Onsite.", date=date(2018, 4, 9)
+        )
+
+    def setUp(self):
+        self.client.login(username="joe", password="password")
+
+    def test_export_csv_has_one_row_per_event(self):
+        resp = self.client.get("/applications/export")
+        self.assertEqual(resp["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(streamed(resp).decode())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            [row["event_description"] for row in rows if row["event_date"]],
+            ["Onsite.", "Applied."],
+        )
+
+    def test_export_ndjson_nests_events(self):
+        resp = self.client.get("/applications/export", {"format": "ndjson"})
+        records = [json.loads(line) for line in streamed(resp).decode().splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[2]["company_name"], "Company, Inc.")
+        self.assertEqual(len(records[2]["events"]), 2)
+
+    def test_export_query_count_does_not_grow(self):
+        # User with profile, applications and one prefetch of events.
+        self.assertQueryBudget(
+            3,
+            lambda: self.client.get("/applications/export"),
+            grow=lambda: Event.objects.bulk_create(
+                Event(application=application, description="Followed up.")
+                for application in Application.objects.all()
+                for i in range(10)
+            ),
+        )
+
+    def test_export_unknown_format(self):
+        resp = self.client.get("/applications/export", {"format": "xml"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_export_command(self):
+        out = io.StringIO()
+        call_command("export_applications", user="joe", format="ndjson", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        joe, jane = (
+            CustomerProfile.objects.create(
+                user=User.objects.create_user(name, name + "@email.com", "password")
+            )
+            for name in ("joe", "jane")
+        )
+        company = Company.objects.create(
+            company_name="Crab Co.", location="Baltimore, MD", sub_industry="Shipping"
+        )
+        rust, python = (
+            Position.objects.create(
+                company=company,
+                position_name=name,
+                is_remote=False,
+                min_salary=50000,
+                max_salary=60000,
+                tech_stack=stack,
+            )
+            for name, stack in (
+                ("Systems Engineer", "Rust, Tokio"),
+                ("Web Developer", "Python, Django"),
+            )
+        )
+        application = Application.objects.create(applicant=joe, position=rust)
+        Application.objects.create(applicant=joe, position=python)
+        Application.objects.create(applicant=jane, position=rust)
+        Event.objects.create(application=application, description="Onsite interviews.")
+
+    def setUp(self):
+        self.client.login(username="joe", password="password")
+
+    def results(self, query):
+        resp = self.client.get("/search", {"q": query})
+        return resp.context["results"]
+
+    def test_search_matches_tech_stack(self):
+        results = self.results("rust")
+        self.assertEqual(
+            [document.application.position.position_name for document in results],
+            ["Systems Engineer"],
+        )
+
+    def test_search_matches_event_descriptions_with_stemming(self):
+        results = self.results("onsite interview")
+        self.assertEqual(
+            [document.event.description for document in results],
+            ["Onsite interviews."],
+        )
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(self.results('crab" OR applicant_id : "2'), [])
+        self.assertEqual(len(self.results("crab")), 2)
+        self.assertEqual(self.results(""), [])
+
+    def test_search_follows_company_changes(self):
+        company = Company.objects.get()
+        company.company_name = "Lobster Ltd."
+        company.save()
+        self.assertEqual(len(self.results("lobster")), 2)
+        self.assertEqual(self.results("crab"), [])
+
+    def test_search_forgets_deleted_events(self):
+        Event.objects.all().delete()
+        self.assertEqual(self.results("onsite"), [])
+
+    def test_rebuild_search_index_command(self):
+        out = io.StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Indexed 4 documents.", out.getvalue())
+        self.assertEqual(len(self.results("rust")), 1)
+
+
+class TagTests(TaskFilesMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        CustomerProfile.objects.create(user=user)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client.login(username="joe", password="password")
+
+    def create_application(self, position_name, **data):
+        self.client.post(
+            "/applications/new",
+            dict(
+                {
+                    "company_name": "Company, Inc.",
+                    "company_location": "Baltimore, MD",
+                    "company_sub_industry": "Widgets",
+                    "position_name": position_name,
+                    "min_salary": 50000,
+                    "max_salary": 60000,
+                    "tech_stack": "Python, Django/PostgreSQL",
+                },
+                **data
+            ),
+        )
+
+    def tag_counts(self):
+        return dict(TagCount.objects.values_list("tag__name", "count"))
+
+    def test_new_application_tags_position_from_tech_stack(self):
+        self.create_application("Engineer")
+        self.assertEqual(
+            sorted(Position.objects.get().tags.values_list("name", flat=True)),
+            ["django", "postgresql", "python"],
+        )
+        self.assertEqual(self.tag_counts(), {"django": 1, "postgresql": 1, "python": 1})
+
+    def test_new_application_with_explicit_tags(self):
+        self.create_application("Engineer", tags="Rust; Tokio")
+        self.create_application("Manager", tags="Rust")
+        self.assertEqual(self.tag_counts(), {"rust": 2, "tokio": 1})
+
+    def test_tag_counts_follow_application_and_tag_changes(self):
+        self.create_application("Engineer", tags="Rust, Go")
+        Application.objects.get().delete()
+        self.assertEqual(self.tag_counts(), {})
+
+        self.create_application("Manager", tags="Rust")
+        Tag.objects.get(name="go").position_set.add(
+            Position.objects.get(position_name="Manager")
+        )
+        self.assertEqual(self.tag_counts(), {"go": 1, "rust": 1})
+
+    def test_tag_changes_refresh_cached_facets(self):
+        self.create_application("Engineer", tags="Rust")
+        resp = self.client.get("/applications")
+        self.assertEqual([c.tag.name for c in resp.context["tag_counts"]], ["rust"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name="go").position_set.add(Position.objects.get())
+        resp = self.client.get("/applications")
+        self.assertEqual(
+            [c.tag.name for c in resp.context["tag_counts"]], ["go", "rust"]
+        )
+
+    def test_applications_filtered_by_tag_with_facets(self):
+        self.create_application("Engineer", tags="Rust")
+        self.create_application("Manager", tags="Python")
+        resp = self.client.get("/applications", {"tag": "rust"})
+        self.assertEqual(
+            [a.position.position_name for a in resp.context["applications_list"]],
+            ["Engineer"],
+        )
+        self.assertEqual(
+            [(c.tag.name, c.count) for c in resp.context["tag_counts"]],
+            [("python", 1), ("rust", 1)],
+        )
+
+    def test_import_tags_positions(self):
+        upload = SimpleUploadedFile(
+            "applications.ndjson",
+            b'{"company_name": "Acme", "company_location": "Baltimore, MD", '
+            b'"company_sub_industry": "Widgets", "position_name": "Engineer", '
+            b'"min_salary": 1, "max_salary": 2, "tags": ["Rust", "Go"]}\n',
+        )
+        self.client.post("/applications/import", {"file": upload})
+        run_tasks()
+        self.assertEqual(self.tag_counts(), {"go": 1, "rust": 1})
+
+
+class ApplicationStatsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        cls.profile = CustomerProfile.objects.create(user=user)
+        widgets = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+        gadgets = Company.objects.create(
+            company_name="Other, Inc.", location="Baltimore, MD", sub_industry="Gadgets"
+        )
+        today = date.today()
+        for i, (company, status, days) in enumerate(
+            (
+                (widgets, ApplicationStatus.OPEN, None),
+                (widgets, ApplicationStatus.DECLINED_BY_EMPLOYER, 10),
+                (widgets, ApplicationStatus.OFFER_EXTENDED, 20),
+                (gadgets, ApplicationStatus.POSITION_ACCEPTED, 40),
+                (gadgets, ApplicationStatus.DECLINED_BY_APPLICANT, 30),
+            )
+        ):
+            position = Position.objects.create(
+                company=company,
+                position_name="Engineer {}".format(i),
+                is_remote=False,
+                min_salary=50000 + i * 10000,
+                max_salary=60000 + i * 10000,
+            )
+            application = Application.objects.create(
+                applicant=cls.profile,
+                position=position,
+                start_date=today - timedelta(days=50),
+                end_date=days and today - timedelta(days=50 - days),
+                status=status,
+            )
+            Event.objects.create(application=application, description="Applied")
+
+    def setUp(self):
+        self.client.login(username="joe", password="password")
+
+    def test_refresh_aggregates_in_the_database(self):
+        with self.assertNumQueries(9):
+            ApplicationStats.objects.refresh([self.profile.pk])
+        stats = ApplicationStats.objects.get(applicant=self.profile)
+        self.assertEqual(stats.total, 5)
+        self.assertEqual(stats.response_rate, 0.8)
+        self.assertEqual(stats.median_days, 25)
+        self.assertEqual(
+            stats.status_breakdown,
+            [
+                ("Open", 1),
+                ("Declined by employer", 1),
+                ("Offer extended", 1),
+                ("Position accepted", 1),
+                ("Declined by applicant", 1),
+            ],
+        )
+        self.assertEqual([count for __, count in stats.events_per_week], [5])
+        self.assertEqual(
+            stats.salaries,
+            [
+                ["Gadgets", 2, 80000, 85000.0, 95000.0, 100000],
+                ["Widgets", 3, 50000, 60000.0, 70000.0, 80000],
+            ],
+        )
+
+    def test_median_of_odd_number_of_closed_applications(self):
+        Application.objects.filter(
+            status=ApplicationStatus.DECLINED_BY_APPLICANT
+        ).update(end_date=None)
+        ApplicationStats.objects.refresh([self.profile.pk])
+        stats = ApplicationStats.objects.get(applicant=self.profile)
+        self.assertEqual(stats.median_days, 20)
+
+    def test_stats_refreshed_when_applications_change(self):
+        ApplicationStats.objects.refresh([self.profile.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.filter(status=ApplicationStatus.OPEN).get().delete()
+        run_tasks()
+        stats = ApplicationStats.objects.get(applicant=self.profile)
+        self.assertEqual(stats.total, 4)
+        self.assertEqual(stats.response_rate, 1)
+
+    def test_one_refresh_is_queued_per_customer(self):
+        application = Application.objects.filter(status=ApplicationStatus.OPEN).get()
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(application=application, description="Applied")
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(application=application, description="Follow up")
+            application.transition(ApplicationStatus.DECLINED_BY_EMPLOYER)
+        self.assertEqual(
+            list(Task.objects.values_list("name", "kwargs")),
+            [("refresh_customer_stats", {"applicant_id": self.profile.pk})],
+        )
+
+    def test_stats_page_reads_one_row(self):
+        ApplicationStats.objects.refresh([self.profile.pk])
+        with self.assertNumQueries(2):
+            resp = self.client.get("/stats")
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Response rate: 80%")
+
+    def test_stats_page_computes_missing_rollup(self):
+        resp = self.client.get("/stats")
+        self.assertEqual(resp.context["stats"].total, 5)
+
+    def test_refresh_stats_command(self):
+        call_command("refresh_stats", stdout=io.StringIO())
+        self.assertEqual(ApplicationStats.objects.get(applicant=self.profile).total, 5)
+
+
+class StatusTransitionTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        cls.profile = CustomerProfile.objects.create(user=user)
+        cls.company = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(username="joe", password="password")
+
+    def create_applications(self, count, status=ApplicationStatus.OPEN):
+        for i in range(count):
+            position = Position.objects.create(
+                company=self.company,
+                position_name="Engineer {}".format(i),
+                is_remote=False,
+                min_salary=50000,
+                max_salary=60000,
+            )
+            Application.objects.create(
+                applicant=self.profile, position=position, status=status
+            )
+        return Application.objects.all()
+
+    def test_transition_logs_event(self):
+        application = self.create_applications(1).get()
+        application.transition(ApplicationStatus.OFFER_EXTENDED)
+        self.assertEqual(application.status, ApplicationStatus.OFFER_EXTENDED)
+        self.assertIsNone(application.end_date)
+        self.assertEqual(
+            Event.objects.get(application=application).description,
+            "Status changed from Open to Offer extended.",
+        )
+
+    def test_terminal_transition_sets_end_date(self):
+        application = self.create_applications(1).get()
+        application.transition(ApplicationStatus.DECLINED_BY_EMPLOYER, date(2018, 5, 1))
+        self.assertEqual(application.end_date, date(2018, 5, 1))
+
+    def test_invalid_transition_changes_nothing(self):
+        self.create_applications(2)
+        Application.objects.filter(pk=Application.objects.first().pk).update(
+            status=ApplicationStatus.POSITION_ACCEPTED
+        )
+        with self.assertRaises(InvalidTransition):
+            Application.objects.all().transition(
+                ApplicationStatus.DECLINED_BY_APPLICANT
+            )
+        self.assertFalse(Event.objects.exists())
+        self.assertEqual(Application.objects.active().count(), 1)
+
+    def test_bulk_transition_query_count_does_not_grow(self):
+        applications = self.create_applications(50)
+        # Read, update, insert the events, count them on the applications,
+        # index them (read, delete, insert), recount tags (delete, read) and
+        # find the users whose cache to drop, plus savepoints.
+        with self.assertNumQueries(16):
+            changed = applications.transition(ApplicationStatus.DECLINED_BY_APPLICANT)
+        self.assertEqual(changed, 50)
+        self.assertEqual(Event.objects.count(), 50)
+        self.assertFalse(Application.objects.active().exists())
+        self.assertFalse(Application.objects.filter(end_date=None).exists())
+
+    def test_status_view(self):
+        application = self.create_applications(1).get()
+        url = "/applications/{}/status".format(application.pk)
+        resp = self.client.post(url, {"status": ApplicationStatus.OFFER_EXTENDED})
+        self.assertRedirects(resp, "/applications/{}".format(application.pk))
+        application.refresh_from_db()
+        self.assertEqual(application.status, ApplicationStatus.OFFER_EXTENDED)
+
+        resp = self.client.post(url, {"status": ApplicationStatus.OPEN}, follow=True)
+        self.assertIn(
+            "Application {} can't change from Offer extended to Open.".format(
+                application.pk
+            ),
+            [str(message) for message in resp.context["messages"]],
+        )
+
+
+class BulkActionsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        cls.profile = CustomerProfile.objects.create(user=user)
+        other = User.objects.create_user("jane", "jane@email.com", "password")
+        cls.other_profile = CustomerProfile.objects.create(user=other)
+        User.objects.create_superuser("admin", "admin@email.com", "password")
+        cls.company = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def create_applications(self, count, profile=None):
+        ids = []
+        for i in range(count):
+            position = Position.objects.create(
+                company=self.company,
+                position_name="Engineer {}".format(i),
+                is_remote=False,
+                min_salary=50000,
+                max_salary=60000,
+            )
+            application = Application.objects.create(
+                applicant=profile or self.profile, position=position
+            )
+            Event.objects.create(application=application, description="Applied")
+            ids.append(application.pk)
+        return ids
+
+    def test_bulk_change_status(self):
+        ids = self.create_applications(3)
+        self.client.login(username="joe", password="password")
+        resp = self.client.post(
+            "/applications/bulk",
+            {
+                "applications": ids[:2],
+                "action": "status",
+                "status": ApplicationStatus.DECLINED_BY_EMPLOYER,
+            },
+        )
+        self.assertRedirects(resp, "/applications")
+        self.assertEqual(
+            list(Application.objects.active().values_list("pk", flat=True)), ids[2:]
+        )
+
+    def test_bulk_add_event(self):
+        ids = self.create_applications(3)
+        self.client.login(username="joe", password="password")
+        self.client.post(
+            "/applications/bulk",
+            {
+                "applications": ids,
+                "action": "event",
+                "description": "Followed up",
+                "date": "2018-05-01",
+            },
+        )
+        self.assertEqual(
+            Event.objects.filter(
+                description="Followed up", date=date(2018, 5, 1)
+            ).count(),
+            3,
+        )
+
+    def test_bulk_delete_is_set_based(self):
+        ids = self.create_applications(20)
+        applications = Application.objects.filter(pk__in=ids)
+        # Read, delete documents, events and applications, recount tags
+        # (delete, read) and find the users whose cache to drop, plus
+        # savepoints.
+        with self.assertNumQueries(11):
+            self.assertEqual(applications.bulk_delete(), 20)
+        self.assertFalse(Application.objects.exists())
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_bulk_delete_updates_what_delete_does(self):
+        rust = Tag.objects.create(name="rust")
+        for profile in (self.profile, self.other_profile):
+            for application in Application.objects.filter(
+                pk__in=self.create_applications(3, profile)
+            ):
+                application.position.tags.add(rust)
+        run_tasks()
+        versions = {
+            profile: fragment_cache.user_version(profile.user_id)
+            for profile in (self.profile, self.other_profile)
+        }
+
+        # Joe's applications and events go in bulk, Jane's one by one.
+        with self.captureOnCommitCallbacks(execute=True):
+            kept = Application.objects.filter(applicant=self.profile).first()
+            Application.objects.filter(applicant=self.profile).exclude(
+                pk=kept.pk
+            ).bulk_delete()
+            Event.objects.filter(application=kept).bulk_delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            kept = Application.objects.filter(applicant=self.other_profile).first()
+            for application in Application.objects.filter(
+                applicant=self.other_profile
+            ).exclude(pk=kept.pk):
+                application.delete()
+            for event in Event.objects.filter(application=kept):
+                event.delete()
+        run_tasks()
+
+        def derived(profile):
+            stats = ApplicationStats.objects.get(applicant=profile)
+            application = Application.objects.get(applicant=profile)
+            return (
+                dict(
+                    TagCount.objects.filter(applicant=profile).values_list(
+                        "tag__name", "count"
+                    )
+                ),
+                SearchDocument.objects.filter(applicant=profile).count(),
+                (stats.total, stats.status_counts, stats.events_per_week),
+                (application.event_count, application.last_event_date),
+            )
+
+        self.assertEqual(
+            derived(self.profile), ({"rust": 1}, 1, (1, {"0": 1}, []), (0, None))
+        )
+        self.assertEqual(derived(self.profile), derived(self.other_profile))
+        for profile, version in versions.items():
+            self.assertNotEqual(fragment_cache.user_version(profile.user_id), version)
+
+    def test_bulk_actions_only_touch_own_applications(self):
+        ids = self.create_applications(1, self.other_profile)
+        self.client.login(username="joe", password="password")
+        resp = self.client.post(
+            "/applications/bulk", {"applications": ids, "action": "delete"}, follow=True
+        )
+        self.assertIn(
+            "Deleted 0 applications.",
+            [str(message) for message in resp.context["messages"]],
+        )
+        self.assertTrue(Application.objects.exists())
+
+    def test_bulk_action_requires_details(self):
+        ids = self.create_applications(1)
+        self.client.login(username="joe", password="password")
+        resp = self.client.post(
+            "/applications/bulk", {"applications": ids, "action": "event"}, follow=True
+        )
+        self.assertIn(
+            "Select applications and a valid action.",
+            [str(message) for message in resp.context["messages"]],
+        )
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_admin_transition_action(self):
+        ids = self.create_applications(2)
+        self.client.login(username="admin", password="password")
+        resp = self.client.get("/admin/applications/application/")
+        self.assertContains(resp, "Mark selected applications as Declined by applicant")
+        self.client.post(
+            "/admin/applications/application/",
+            {"action": "mark_declined_by_applicant", "_selected_action": ids},
+        )
+        self.assertFalse(Application.objects.active().exists())
+
+    def test_admin_add_event_action(self):
+        ids = self.create_applications(2)
+        self.client.login(username="admin", password="password")
+        data = {"action": "add_event", "_selected_action": ids}
+        resp = self.client.post("/admin/applications/application/", data)
+        self.assertContains(resp, "2 selected applications")
+
+        data.update(apply="1", description="Followed up", date="2018-05-01")
+        self.client.post("/admin/applications/application/", data)
+        self.assertEqual(Event.objects.filter(description="Followed up").count(), 2)
+
+    def test_admin_delete_action(self):
+        self.create_applications(2)
+        self.client.login(username="admin", password="password")
+        self.client.post(
+            "/admin/applications/event/",
+            {
+                "action": "delete_selected",
+                "_selected_action": list(Event.objects.values_list("pk", flat=True)),
+                "post": "yes",
+            },
+        )
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(SearchDocument.objects.exclude(event=None).exists())
+
+
+class EventCountersTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        cls.profile = CustomerProfile.objects.create(user=user)
+        company = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+        for i in range(2):
+            position = Position.objects.create(
+                company=company,
+                position_name="Engineer {}".format(i),
+                is_remote=False,
+                min_salary=50000,
+                max_salary=60000,
+            )
+            Application.objects.create(applicant=cls.profile, position=position)
+
+    def setUp(self):
+        cache.clear()
+        self.first, self.second = Application.objects.order_by("pk")
+        self.client.login(username="joe", password="password")
+
+    def assertCounters(self, application, count, last_event_date):
+        application.refresh_from_db()
+        self.assertEqual(application.event_count, count)
+        self.assertEqual(application.last_event_date, last_event_date)
+
+    def test_adding_and_deleting_events_updates_counters(self):
+        for day in (3, 1):
+            self.client.post(
+                "/applications/{}/events".format(self.first.pk),
+                {"description": "Followed up.", "date": "2018-05-0{}".format(day)},
+            )
+        self.assertCounters(self.first, 2, date(2018, 5, 3))
+        self.assertGreater(self.first.last_activity_at, self.second.last_activity_at)
+
+        latest = Event.objects.get(date=date(2018, 5, 3))
+        self.client.delete(
+            "/applications/{}/events/{}".format(self.first.pk, latest.pk)
+        )
+        self.assertCounters(self.first, 1, date(2018, 5, 1))
+
+    def test_bulk_paths_update_counters(self):
+        applications = Application.objects.all()
+        applications.add_event("Followed up.", date(2018, 5, 1))
+        applications.transition(ApplicationStatus.OFFER_EXTENDED, date(2018, 5, 2))
+        self.assertCounters(self.second, 2, date(2018, 5, 2))
+
+        Event.objects.filter(date=date(2018, 5, 2)).bulk_delete()
+        self.assertCounters(self.second, 1, date(2018, 5, 1))
+
+    def test_rebuild_event_counters(self):
+        Event.objects.create(application=self.first, date=date(2018, 5, 1))
+        Application.objects.update(event_count=5, last_event_date=None)
+        out = io.StringIO()
+        call_command("rebuild_event_counters", batch_size=1, stdout=out)
+        self.assertIn("Recounted the events of 2 applications.", out.getvalue())
+        self.assertCounters(self.first, 1, date(2018, 5, 1))
+        self.assertCounters(self.second, 0, None)
+
+    def test_list_is_sorted_by_activity(self):
+        Event.objects.create(application=self.first, description="Followed up.")
+        content = self.client.get("/applications").content.decode()
+        self.assertLess(content.index("Engineer 0"), content.index("Engineer 1"))
+        self.assertIn("1 event, the last on", content)
+        self.assertIn("0 events", content)
+
+
+class AdminTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User.objects.create_superuser("admin", "admin@email.com", "password")
+        for i in range(3):
+            user = User.objects.create_user("joe{}".format(i), "joe@email.com", "pw")
+            profile = CustomerProfile.objects.create(user=user)
+            company = Company.objects.create(
+                company_name="Company {}".format(i),
+                location="Baltimore, MD",
+                sub_industry="Widgets",
+            )
+            position = Position.objects.create(
+                company=company,
+                position_name="Engineer",
+                is_remote=False,
+                min_salary=50000,
+                max_salary=60000,
+            )
+            application = Application.objects.create(
+                applicant=profile, position=position
+            )
+            Event.objects.create(application=application, description="Applied")
+
+    def setUp(self):
+        self.client.login(username="admin", password="password")
+
+    def test_changelists_query_count_does_not_grow(self):
+        # User, the count and the page, plus the date hierarchy or the status
+        # filter where configured.
+        for model, queries in (
+            ("application", 6),
+            ("event", 6),
+            ("position", 4),
+            ("company", 4),
+            ("customerprofile", 4),
+        ):
+            with self.subTest(model=model), self.assertNumQueries(queries):
+                resp = self.client.get("/admin/applications/{}/".format(model))
+            self.assertEqual(resp.status_code, 200)
+
+    def test_change_form_uses_autocomplete(self):
+        application = Application.objects.first()
+        resp = self.client.get(
+            "/admin/applications/application/{}/change/".format(application.pk)
+        )
+        self.assertContains(resp, "admin-autocomplete")
+        resp = self.client.get(
+            "/admin/autocomplete/",
+            {
+                "app_label": "applications",
+                "model_name": "application",
+                "field_name": "position",
+                "term": "Engineer",
+            },
+        )
+        self.assertEqual(len(resp.json()["results"]), 3)
+
+    def test_search_matches_exact_indexed_values(self):
+        resp = self.client.get("/admin/applications/application/", {"q": '"Company 1"'})
+        self.assertEqual(resp.context["cl"].result_count, 1)
+        resp = self.client.get("/admin/applications/application/", {"q": "Company"})
+        self.assertEqual(resp.context["cl"].result_count, 0)
+
+    def test_unfiltered_count_is_estimated_on_large_tables(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        Event.objects.create(application=Application.objects.first(), description="x")
+        with mock.patch("applications.pagination.ESTIMATE_THRESHOLD", 1):
+            resp = self.client.get("/admin/applications/event/")
+            # The statistics predate the last event.
+            self.assertEqual(resp.context["cl"].result_count, 3)
+            resp = self.client.get(
+                "/admin/applications/event/", {"date__gte": "2000-01-01"}
+            )
+        self.assertEqual(resp.context["cl"].result_count, 4)
+
+    def test_unanalyzed_tables_are_counted(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS sqlite_stat1")
+        self.assertIsNone(estimated_count(Application, "default"))
+        with mock.patch("applications.pagination.ESTIMATE_THRESHOLD", 1):
+            resp = self.client.get("/admin/applications/application/")
+        self.assertEqual(resp.context["cl"].result_count, 3)
+
+        call_command("analyze_database", stdout=io.StringIO())
+        self.assertEqual(estimated_count(Application, "default"), 3)
+
+    def test_estimate_ignores_partial_indexes(self):
+        # Leaves one application in the partial index of active ones.
+        Application.objects.filter(pk__in=Application.objects.values("pk")[:2]).update(
+            status=ApplicationStatus.DECLINED_BY_EMPLOYER
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        with mock.patch("applications.pagination.ESTIMATE_THRESHOLD", 1):
+            resp = self.client.get("/admin/applications/application/")
+        self.assertEqual(resp.context["cl"].result_count, 3)
+
+
+class InstrumentationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(
+            "joe", "joe@email.com", "password", is_staff=True
+        )
+        CustomerProfile.objects.create(user=user)
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.totals.pending = {}
+        self.client.login(username="joe", password="password")
+
+    def test_disabled_by_default(self):
+        resp = self.client.get("/applications")
+        self.assertNotIn("Server-Timing", resp)
+
+    @override_settings(INSTRUMENT_REQUESTS=True)
+    def test_server_timing_header_only_for_staff_or_in_debug(self):
+        user = User.objects.create_user("jane", "jane@email.com", "password")
+        CustomerProfile.objects.create(user=user)
+        self.client.login(username="jane", password="password")
+        resp = self.client.get("/applications")
+        self.assertNotIn("Server-Timing", resp)
+        with self.settings(DEBUG=True):
+            resp = self.client.get("/applications")
+        self.assertIn("Server-Timing", resp)
+
+    @override_settings(INSTRUMENT_REQUESTS=True)
+    def test_server_timing_header(self):
+        resp = self.client.get("/applications")
+        self.assertRegex(
+            resp["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="3 queries, 0 duplicates", tpl;dur=[\d.]+, '
+            r"total;dur=[\d.]+$",
+        )
+
+    @override_settings(INSTRUMENT_REQUESTS=True)
+    async def test_server_timing_header_under_asgi(self):
+        await self.async_client.alogin(username="joe", password="password")
+        resp = await self.async_client.get("/applications")
+        self.assertIn('desc="3 queries, 0 duplicates"', resp["Server-Timing"])
+
+    @override_settings(INSTRUMENT_REQUESTS=True)
+    def test_report_per_view(self):
+        self.client.get("/applications")
+        self.client.get("/applications")
+        self.client.get("/search", {"q": "engineer"})
+        rows = {row["view"]: row for row in instrumentation.report()}
+        self.assertEqual(rows["applications:applications"]["requests"], 2)
+        # The second request is served from the fragment cache.
+        self.assertEqual(rows["applications:applications"]["queries"], 2)
+        self.assertGreater(rows["applications:applications"]["template_ms"], 0)
+        self.assertEqual(rows["applications:search"]["requests"], 1)
+
+        out = io.StringIO()
+        call_command("instrumentation_report", stdout=out)
+        self.assertIn("applications:applications", out.getvalue())
+
+    def test_totals_from_every_process_are_summed(self):
+        recorder = instrumentation.Recorder()
+        recorder.statements["SELECT 1"] = 2
+        # As flushed by two worker processes.
+        instrumentation.flush({"applications:applications": [1, 2, 0, 0, 0, 3000]})
+        instrumentation.flush({"applications:applications": [1, 4, 0, 0, 0, 1000]})
+        instrumentation.record("applications:applications", recorder, 0.002)
+        row = instrumentation.report()[0]
+        self.assertEqual(row["requests"], 3)
+        self.assertEqual(row["queries"], 8 / 3)
+        self.assertEqual(row["total_ms"], 2)
+
+    def test_recorder_counts_duplicate_queries(self):
+        recorder = instrumentation.Recorder()
+        execute = mock.Mock()
+        for pk in range(3):
+            recorder.execute(execute, "SELECT %s", [pk], False, {})
+        recorder.execute(execute, "SELECT 1", [], False, {})
+        self.assertEqual(recorder.queries, 4)
+        self.assertEqual(recorder.duplicate_queries, 2)
+
+
+class BenchmarkTests(TestCase):
+
+    def test_seed_and_benchmark_views(self):
+        out = io.StringIO()
+        call_command(
+            "seed_benchmark",
+            users=2,
+            applications=10,
+            events=20,
+            companies=3,
+            stdout=out,
+        )
+        self.assertEqual(Application.objects.count(), 10)
+        self.assertEqual(Event.objects.count(), 20)
+        self.assertEqual(
+            ApplicationStats.objects.get(applicant__user__username="bench0").total, 5
+        )
+        self.assertTrue(TagCount.objects.exists())
+
+        with tempfile.NamedTemporaryFile("r") as f:
+            call_command("benchmark_views", requests=2, save=f.name, stdout=out)
+            results = json.load(f)
+        self.assertEqual(results["applications"]["queries"], 1)
+        # Writes are rolled back.
+        self.assertEqual(Application.objects.count(), 10)
+
+        results["applications (uncached)"]["queries"] = 1
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump(results, f)
+            f.flush()
+            with self.assertRaisesMessage(
+                CommandError, "applications (uncached): 3 queries, baseline 1"
+            ):
+                call_command("benchmark_views", requests=2, baseline=f.name, stdout=out)
+
+    def test_benchmark_templates(self):
+        out = io.StringIO()
+        with self.assertNumQueries(0):
+            call_command("benchmark_templates", items=3, renders=2, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 7)
+        self.assertIn("applications/application_details.html", lines[-1])
+        self.assertIn("cached fragment", lines[-1])
+
+    def test_templates_are_compiled_once(self):
+        loader = Engine.get_default().template_loaders[0]
+        self.assertIsInstance(loader, CachedLoader)
+        template = loader.get_template("applications/applications.html")
+        self.assertIs(loader.get_template("applications/applications.html"), template)
+
+
+class AsyncViewsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        profile = CustomerProfile.objects.create(user=user)
+        company = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+        position = Position.objects.create(
+            company=company,
+            position_name="Software Engineer",
+            is_remote=False,
+            min_salary=50000,
+            max_salary=60000,
+        )
+        application = Application.objects.create(applicant=profile, position=position)
+        Event.objects.create(application=application, description="Phone screen.")
+
+    def setUp(self):
+        cache.clear()
+
+    # Django logs the sync middleware it adapts in DEBUG.
+    @override_settings(DEBUG=True)
+    async def test_read_views_run_without_sync_adapters(self):
+        await self.async_client.alogin(username="joe", password="password")
+        with self.assertLogs("django.request", "DEBUG") as logs:
+            resp = await self.async_client.get("/")
+        self.assertEqual([line for line in logs.output if "adapted" in line], [])
+        self.assertContains(resp, "Job Search CRM")
+
+        resp = await self.async_client.get("/applications")
+        self.assertContains(resp, "Software Engineer")
+        resp = await self.async_client.get("/applications/1")
+        self.assertContains(resp, "Phone screen.")
+
+    async def test_export_streams_from_an_async_iterator(self):
+        await self.async_client.alogin(username="joe", password="password")
+        resp = await self.async_client.get("/applications/export", {"format": "ndjson"})
+        self.assertTrue(resp.is_async)
+        content = b"".join([part async for part in resp.streaming_content])
+        self.assertEqual(
+            json.loads(content)["events"][0]["description"], "Phone screen."
+        )
+
+    def test_export_streams_from_a_sync_iterator_under_wsgi(self):
+        self.client.login(username="joe", password="password")
+        resp = self.client.get("/applications/export", {"format": "ndjson"})
+        self.assertFalse(resp.is_async)
+        content = b"".join(resp.streaming_content)
+        self.assertEqual(
+            json.loads(content)["events"][0]["description"], "Phone screen."
+        )
+
+
+class DatabaseTests(TestCase):
+
+    def test_sqlite_connections_use_wal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = dict(
+                connection.settings_dict, NAME=os.path.join(directory, "db.sqlite3")
+            )
+            new_connection = type(connections["default"])(settings_dict)
+            try:
+                with new_connection.cursor() as cursor:
+                    pragmas = {}
+                    for pragma in ("journal_mode", "synchronous", "busy_timeout"):
+                        cursor.execute("PRAGMA {}".format(pragma))
+                        pragmas[pragma] = cursor.fetchone()[0]
+            finally:
+                new_connection.close()
+        # synchronous=NORMAL reads back as 1.
+        self.assertEqual(
+            pragmas, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000}
+        )
+
+
+class MigrationTests(TransactionTestCase):
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([("applications", target)])
+
+    def test_recount_tag_counts(self):
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        profile = CustomerProfile.objects.create(user=user)
+        company = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+        for name, status in [
+            ("Engineer", ApplicationStatus.OPEN),
+            ("Manager", ApplicationStatus.OFFER_EXTENDED),
+            ("Director", ApplicationStatus.DECLINED_BY_EMPLOYER),
+        ]:
+            position = Position.objects.create(
+                company=company,
+                position_name=name,
+                is_remote=False,
+                min_salary=50000,
+                max_salary=60000,
+            )
+            position.tags.add(Tag.objects.get_or_create(name="rust")[0])
+            Application.objects.create(
+                applicant=profile, position=position, status=status
+            )
+        # Counts as 0007 left them, missing the applications stored as codes.
+        TagCount.objects.update(count=1)
+
+        self.migrate("0013_viewtiming")
+        self.migrate("0014_recount_tag_counts")
+        self.assertEqual(
+            list(TagCount.objects.values_list("tag__name", "count")), [("rust", 2)]
+        )
+
+
+@override_settings(REPLICA_DATABASES=["replica"])
+class ReplicaRoutingTests(TransactionTestCase):
+
+    def setUp(self):
+        # A second connection to the test database stands in for a replica.
+        self.use_replica(dict(connection.settings_dict))
+        self.addCleanup(connections.__delitem__, "replica")
+        routers.unavailable.clear()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        profile = CustomerProfile.objects.create(user=user)
+        company = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+        position = Position.objects.create(
+            company=company,
+            position_name="Software Engineer",
+            is_remote=False,
+            min_salary=50000,
+            max_salary=60000,
+        )
+        self.application = Application.objects.create(
+            applicant=profile, position=position
+        )
+        self.client.login(username="joe", password="password")
+
+    def use_replica(self, settings_dict):
+        replica = type(connections["default"])(settings_dict, "replica")
+        connections["replica"] = replica
+        self.addCleanup(replica.close)
+
+    def test_reads_go_to_the_replica_until_the_user_writes(self):
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            resp = self.client.get("/applications")
+        self.assertContains(resp, "Software Engineer")
+        self.assertTrue(replica.captured_queries)
+        self.assertNotIn(routers.PIN_COOKIE, resp.cookies)
+
+        resp = self.client.post(
+            "/applications/{}/events".format(self.application.pk),
+            {"description": "Phone screen.", "date": "2018-05-01"},
+        )
+        self.assertEqual(resp.cookies[routers.PIN_COOKIE]["max-age"], 10)
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            resp = self.client.get("/applications/{}".format(self.application.pk))
+        self.assertContains(resp, "Phone screen.")
+        self.assertEqual(replica.captured_queries, [])
+
+    def test_exports_stream_from_the_replica(self):
+        Event.objects.create(application=self.application, description="Phone screen.")
+        replica = connections["replica"]
+        replica.ensure_connection()
+        # The async view looks the replica up outside this thread, too.
+        settings = mock.patch.dict(
+            connections.settings, {"replica": replica.settings_dict}
+        )
+        with settings, CaptureQueriesContext(replica) as replica:
+            resp = self.client.get("/applications/export")
+            content = streamed(resp).decode()
+        self.assertIn("Phone screen.", content)
+        # Applications and their events.
+        self.assertEqual(len(replica.captured_queries), 2)
+
+    def test_bulk_actions_run_on_the_primary(self):
+        actions = [
+            {"action": "event", "description": "Followed up", "date": "2018-05-01"},
+            {"action": "status", "status": ApplicationStatus.DECLINED_BY_EMPLOYER},
+            {"action": "delete"},
+        ]
+        for data in actions:
+            with self.subTest(action=data["action"]):
+                with CaptureQueriesContext(connections["replica"]) as replica:
+                    resp = self.client.post(
+                        "/applications/bulk",
+                        dict(data, applications=[self.application.pk]),
+                    )
+                self.assertRedirects(
+                    resp, "/applications", fetch_redirect_response=False
+                )
+                # Not even the rows to change are read from the replica.
+                self.assertFalse(
+                    [
+                        query["sql"]
+                        for query in replica.captured_queries
+                        if "applications_application" in query["sql"]
+                    ]
+                )
+        self.assertFalse(Application.objects.exists())
+        self.assertFalse(Event.objects.exists())
+
+    def test_unavailable_replica_falls_back_to_the_primary(self):
+        self.use_replica(
+            dict(connection.settings_dict, NAME="/nonexistent/replica.sqlite3")
+        )
+        with self.assertLogs("applications.routers", "WARNING"):
+            resp = self.client.get("/applications")
+        self.assertContains(resp, "Software Engineer")
+        self.assertIn("replica", routers.unavailable)
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(Application.objects.all().db, "default")
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Every URL of the app runs a fixed number of queries, however many
+    applications and events its customer has."""
+
+    # URL name: (method, path, data, budget). Paths are formatted with the
+    # first application and event of the customer.
+    BUDGETS = {
+        "home": ("get", "/", None, 1),
+        "create_account": ("get", "/accounts/register", None, 1),
+        "create_profile": ("get", "/accounts/register/profile", None, 1),
+        "view_profile": ("get", "/accounts/profile", None, 1),
+        "login": (
+            "post",
+            "/accounts/login",
+            {"username": "joe", "password": "password"},
+            10,
+        ),
+        "logout": ("get", "/accounts/logout", None, 3),
+        "applications": ("get", "/applications", None, 3),
+        "new_application": ("get", "/applications/new", None, 1),
+        "bulk_applications": (
+            "post",
+            "/applications/bulk",
+            {"applications": "{application}", "action": "event", "description": "x"},
+            14,
+        ),
+        "export_applications": ("get", "/applications/export", None, 3),
+        "import_applications": ("get", "/applications/import", None, 1),
+        "application": ("get", "/applications/{application}", None, 3),
+        "application_status": (
+            "post",
+            "/applications/{application}/status",
+            {"status": ApplicationStatus.OFFER_EXTENDED},
+            22,
+        ),
+        "new_event": ("get", "/applications/{application}/events", None, 1),
+        "delete_event": (
+            "delete",
+            "/applications/{application}/events/{event}",
+            None,
+            9,
+        ),
+        "search": ("get", "/search", {"q": "engineer"}, 3),
+        "stats": ("get", "/stats", None, 12),
+        "fragment_cache_stats": ("get", "/stats/cache", None, 1),
+        "queue_export": ("post", "/applications/export/queue", None, 2),
+        "task": ("get", "/tasks/{task}", None, 2),
+        "task_download": ("get", "/tasks/{task}/download", None, 2),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(
+            "joe", "joe@email.com", "password", is_staff=True
+        )
+        profile = CustomerProfile.objects.create(user=user)
+        cls.create_applications(1)
+        Task.objects.create(
+            name="export_applications",
+            owner=profile,
+            status=TaskStatus.DONE,
+            result={"path": "exports/missing.csv", "format": "csv", "applications": 1},
+        )
+
+    @classmethod
+    def create_applications(cls, count):
+        profile = CustomerProfile.objects.get(user__username="joe")
+        tags = Tag.objects.for_names(["python", "django"])
+        start = Application.objects.count()
+        for i in range(start, start + count):
+            company = Company.objects.create(
+                company_name="Company {}".format(i),
+                location="Baltimore, MD",
+                sub_industry="Widgets",
+            )
+            position = Position.objects.create(
+                company=company,
+                position_name="Engineer {}".format(i),
+                is_remote=False,
+                min_salary=50000,
+                max_salary=60000,
+                tech_stack="Python, Django",
+            )
+            position.tags.set(tags)
+            application = Application.objects.create(
+                applicant=profile, position=position
+            )
+            for description in ("Applied.", "Phone screen.", "Onsite."):
+                Event.objects.create(application=application, description=description)
+
+    def request(self, name):
+        method, path, data, budget = self.BUDGETS[name]
+        application = Application.objects.order_by("pk").first()
+        values = {
+            "application": application.pk,
+            "event": application.event_set.first().pk,
+            "task": Task.objects.get().pk,
+        }
+        path = path.format(**values)
+        if data:
+            data = {
+                key: value.format(**values) if isinstance(value, str) else value
+                for key, value in data.items()
+            }
+        # A new client every time, as the session cache keeps the sessions of
+        # rolled back requests.
+        self.client = self.client_class()
+        if name != "login":
+            self.client.force_login(User.objects.get(username="joe"))
+        return lambda: getattr(self.client, method)(path, data)
+
+    def test_every_url_has_a_budget(self):
+        names = {
+            pattern.name for pattern in get_resolver("applications.urls").url_patterns
+        }
+        self.assertEqual(names, set(self.BUDGETS))
+
+    def test_query_count_does_not_grow(self):
+        small = {name: self.count_queries(self.request(name)) for name in self.BUDGETS}
+        self.create_applications(25)
+        for name, (__, __, __, budget) in self.BUDGETS.items():
+            with self.subTest(name=name):
+                large = self.count_queries(self.request(name))
+                # Exact, so that a view running fewer queries lowers its
+                # budget and any later increase fails.
+                self.assertWithinBudget(small[name], budget, exact=True)
+                self.assertEqual(len(small[name]), len(large))
+
+    def test_growing_query_count_fails(self):
+        def request():
+            for application in Application.objects.all():
+                application.position.company
+            return HttpResponse()
+
+        with self.assertRaisesMessage(AssertionError, "grows with the data"):
+            self.assertQueryBudget(
+                100, request, grow=lambda: self.create_applications(2)
+            )
+
+
+class TaskTests(TaskFilesMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user("joe", "joe@email.com", "password")
+        cls.profile = CustomerProfile.objects.create(user=user)
+        other = User.objects.create_user("jane", "jane@email.com", "password")
+        cls.other_profile = CustomerProfile.objects.create(user=other)
+        company = Company.objects.create(
+            company_name="Company, Inc.",
+            location="Baltimore, MD",
+            sub_industry="Widgets",
+        )
+        position = Position.objects.create(
+            company=company,
+            position_name="Engineer",
+            is_remote=False,
+            min_salary=50000,
+            max_salary=60000,
+        )
+        Application.objects.create(applicant=cls.profile, position=position)
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username="joe", password="password")
+        failing = mock.Mock(side_effect=RuntimeError("Boom"))
+        registry = mock.patch.dict(
+            tasks.registry, {"fail": failing, "noop": mock.Mock(return_value=None)}
+        )
+        registry.start()
+        self.addCleanup(registry.stop)
+
+    def test_export_in_the_background(self):
+        resp = self.client.post("/applications/export/queue", {"format": "ndjson"})
+        task = Task.objects.get()
+        self.assertRedirects(
+            resp, "/tasks/{}".format(task.pk), fetch_redirect_response=False
+        )
+        self.assertEqual(
+            self.client.get("/tasks/{}".format(task.pk), {"format": "json"}).json(),
+            {
+                "status": "Queued",
+                "finished": False,
+                "done": 0,
+                "total": None,
+                "result": None,
+            },
+        )
+
+        run_tasks()
+        resp = self.client.get("/tasks/{}".format(task.pk))
+        self.assertContains(resp, "Exported 1 applications.")
+        resp = self.client.get("/tasks/{}/download".format(task.pk))
+        self.assertEqual(
+            resp["Content-Disposition"], 'attachment; filename="applications.ndjson"'
+        )
+        record = json.loads(b"".join(resp.streaming_content))
+        self.assertEqual(record["position_name"], "Engineer")
+
+    def test_tasks_are_private(self):
+        task = tasks.enqueue("fail", owner=self.other_profile)
+        resp = self.client.get("/tasks/{}".format(task.pk))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_failed_tasks_are_retried_with_backoff(self):
+        task = tasks.enqueue("fail", owner=self.profile)
+        for attempt in (1, 2):
+            with self.assertLogs("applications.tasks", "ERROR"):
+                run_tasks()
+            task.refresh_from_db()
+            self.assertEqual(task.status, TaskStatus.QUEUED)
+            self.assertEqual(task.attempts, attempt)
+            self.assertIn("RuntimeError: Boom", task.error)
+            delay = task.run_at - timezone.now()
+            self.assertGreater(delay, timedelta(seconds=29 * 2 ** (attempt - 1)))
+            # Not due yet.
+            run_tasks()
+            self.assertEqual(Task.objects.get().attempts, attempt)
+            Task.objects.update(run_at=timezone.now())
+
+        with self.assertLogs("applications.tasks", "ERROR"):
+            run_tasks()
+        task.refresh_from_db()
+        self.assertEqual(task.status, TaskStatus.FAILED)
+        self.assertEqual(task.attempts, 3)
+        resp = self.client.get("/tasks/{}".format(task.pk))
+        self.assertContains(resp, "The task failed after 3 attempts.")
+
+    def test_tasks_whose_lease_expired_are_claimed_again(self):
+        task = tasks.enqueue("fail")
+        self.assertEqual(Task.objects.claim(5, 60), [task.pk])
+        self.assertEqual(Task.objects.claim(5, 60), [])
+        Task.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(Task.objects.claim(5, 60), [task.pk])
+        self.assertEqual(Task.objects.get().attempts, 2)
+
+    def test_lost_tasks_out_of_attempts_fail(self):
+        task = tasks.enqueue("fail")
+        Task.objects.update(
+            status=TaskStatus.RUNNING,
+            attempts=3,
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(Task.objects.claim(5, 60), [])
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (TaskStatus.FAILED, 3))
+        self.assertIsNotNone(task.finished_at)
+
+    def test_progress_renews_the_lease(self):
+        task = tasks.enqueue("fail")
+        Task.objects.claim(1, 0)
+        tasks.Progress(task.pk, 60)(5, 10)
+        task.refresh_from_db()
+        self.assertEqual((task.done, task.total, task.percent), (5, 10, 50))
+        self.assertEqual(Task.objects.claim(1, 60), [])
+
+    def test_enqueue_task_command(self):
+        out = io.StringIO()
+        call_command("enqueue_task", "refresh_stats", stdout=out)
+        run_tasks()
+        task = Task.objects.get()
+        self.assertEqual(task.status, TaskStatus.DONE)
+        self.assertIn("Refreshed 2 customers.", task.result["output"])
+
+    def test_worker_restarts_its_pool_when_a_process_dies(self):
+        ids = [tasks.enqueue("noop").pk for __ in range(3)]
+        pools = []
+
+        class InlinePool:
+            """Runs tasks in this process; the first one submitted kills the
+            first pool, which then refuses more."""
+
+            def __init__(self, **kwargs):
+                self.broken = not pools
+                self.submitted = 0
+                pools.append(self)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                pass
+
+            def submit(self, function, *args):
+                if self.broken and self.submitted:
+                    raise BrokenProcessPool()
+                self.submitted += 1
+                future = Future()
+                if self.broken:
+                    future.set_exception(BrokenProcessPool())
+                else:
+                    future.set_result(function(*args))
+                return future
+
+        err = io.StringIO()
+        with mock.patch(
+            "applications.management.commands.run_worker.ProcessPoolExecutor",
+            InlinePool,
+        ):
+            call_command(
+                "run_worker", processes=2, once=True, stdout=io.StringIO(), stderr=err
+            )
+        self.assertIn("A worker process died", err.getvalue())
+        self.assertEqual(len(pools), 2)
+        self.assertEqual(
+            list(
+                Task.objects.filter(pk__in=ids)
+                .order_by("pk")
+                .values_list("status", "attempts")
+            ),
+            [(TaskStatus.DONE, 2), (TaskStatus.DONE, 2), (TaskStatus.DONE, 1)],
+        )
+
+    def test_released_tasks_out_of_attempts_fail(self):
+        task = tasks.enqueue("fail")
+        Task.objects.update(status=TaskStatus.RUNNING, attempts=3)
+        Task.objects.release()
+        task.refresh_from_db()
+        self.assertEqual(task.status, TaskStatus.FAILED)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_worker_warns_about_a_cache_per_process(self):
+        err = io.StringIO()
+        call_command(
+            "run_worker", processes=0, once=True, stdout=io.StringIO(), stderr=err
+        )
+        self.assertIn("The default cache is local to each process", err.getvalue())
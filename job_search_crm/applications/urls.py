@@ -2,10 +2,11 @@ from django.urls import path
 from django.contrib.auth.decorators import login_required
 
 from . import views
+from .middleware import profile_required
 
 app_name = "applications"
 urlpatterns = [
-    path("", views.IndexView.as_view(), name="home"),
+    path("", profile_required(views.IndexView.as_view()), name="home"),
     path("accounts/register", views.CreateAccountView.as_view(), name="create_account"),
     path(
         "accounts/register/profile",
@@ -14,7 +15,7 @@ urlpatterns = [
     ),
     path(
         "accounts/profile",
-        login_required(views.ProfileView.as_view()),
+        login_required(profile_required(views.ProfileView.as_view())),
         name="view_profile",
     ),
     path("accounts/login", views.login, name="login"),
@@ -22,22 +23,40 @@ urlpatterns = [
     path("applications", views.applications, name="applications"),
     path(
         "applications/new",
-        login_required(views.NewApplicationView.as_view()),
+        login_required(profile_required(views.NewApplicationView.as_view())),
         name="new_application",
     ),
+    path("applications/bulk", views.bulk_applications, name="bulk_applications"),
+    path("applications/export", views.export_applications, name="export_applications"),
+    path("applications/export/queue", views.queue_export, name="queue_export"),
+    path(
+        "applications/import",
+        login_required(profile_required(views.ImportApplicationsView.as_view())),
+        name="import_applications",
+    ),
     path(
         "applications/<int:application_id>",
-        login_required(views.ApplicationDetailView.as_view()),
+        login_required(profile_required(views.ApplicationDetailView.as_view())),
         name="application",
     ),
+    path(
+        "applications/<int:application_id>/status",
+        login_required(profile_required(views.ApplicationStatusView.as_view())),
+        name="application_status",
+    ),
     path(
         "applications/<int:application_id>/events",
-        login_required(views.EventsView.as_view()),
+        login_required(profile_required(views.EventsView.as_view())),
         name="new_event",
     ),
     path(
         "applications/<int:application_id>/events/<int:event_id>",
-        login_required(views.EventByIdView.as_view()),
+        login_required(profile_required(views.EventByIdView.as_view())),
         name="delete_event",
     ),
+    path("search", views.search, name="search"),
+    path("stats", views.stats, name="stats"),
+    path("stats/cache", views.fragment_cache_stats, name="fragment_cache_stats"),
+    path("tasks/<int:task_id>", views.task, name="task"),
+    path("tasks/<int:task_id>/download", views.task_download, name="task_download"),
 ]
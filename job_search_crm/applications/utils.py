@@ -0,0 +1,23 @@
+import math
+from itertools import islice
+
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+async def alist(queryset):
+    """Evaluate `queryset` from async code."""
+    return [obj async for obj in queryset]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    values = sorted(values)
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
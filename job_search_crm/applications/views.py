@@ -1,23 +1,63 @@
-from django.core.exceptions import ValidationError
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import (
-    authenticate, login as auth_login, logout as auth_logout
+    authenticate,
+    login as auth_login,
+    logout as auth_logout,
+    update_session_auth_hash,
 )
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.utils import IntegrityError
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.views.decorators.http import require_POST
 from django.views.generic import DetailView, ListView, TemplateView
 from django.views.generic.edit import FormView
 
-from .models import (Application, Company, CustomerProfile, Event, Position)
+from .models import (
+    Application,
+    ApplicationStats,
+    Company,
+    CustomerProfile,
+    Event,
+    InvalidTransition,
+    Position,
+    Tag,
+    TagCount,
+    Task,
+    TaskStatus,
+    parse_tags,
+)
+from . import cache, exports, tasks
+from .imports import guess_format
+from .middleware import profile_required
+from .pagination import KeysetPaginator
+from .search import search as search_documents
+from .utils import alist
 from .forms import (
+    ApplicationStatusForm,
+    BulkApplicationsForm,
     CreateAccountForm,
     CreateProfileForm,
     CustomerProfileForm,
+    ImportApplicationsForm,
     NewApplicationForm,
     NewEventForm,
 )
@@ -26,17 +66,12 @@ from .forms import (
 class IndexView(TemplateView):
     template_name = "applications/index.html"
 
-    def get(self, request):
-        customer = None
-        if not request.user.is_anonymous:
-            try:
-                customer = CustomerProfile.objects.get(user=request.user)
-            except CustomerProfile.DoesNotExist:
-                return HttpResponseRedirect(reverse("applications:create_profile"))
-
-        return render(request, "applications/index.html", {"customer": customer})
+    async def get(self, request):
+        return render(
+            request, "applications/index.html", {"customer": request.customer}
+        )
 
-    def post(self, request):
+    async def post(self, request):
         return render(request, "applications/405.html", status=405)
 
 
@@ -57,8 +92,9 @@ class CreateAccountView(FormView):
             try:
                 validate_password(password)
                 u = User.objects.create_user(username, email, password)
-                u.save()
-                auth_login(request, u)
+                auth_login(
+                    request, u, backend="applications.backends.CustomerProfileBackend"
+                )
                 return HttpResponseRedirect(reverse("applications:create_profile"))
 
             except IntegrityError:
@@ -108,11 +144,8 @@ def login(request):
         messages.error(request, "Username or password did not match.")
         return HttpResponseRedirect(reverse("applications:home"))
 
-    if not user.is_superuser:
-        try:
-            profile = CustomerProfile.objects.get(user=user)
-        except CustomerProfile.DoesNotExist:
-            return HttpResponseRedirect(reverse("applications:create_profile"))
+    if not user.is_superuser and not hasattr(user, "customerprofile"):
+        return HttpResponseRedirect(reverse("applications:create_profile"))
 
     if request.GET.get("next"):
         return HttpResponseRedirect(request.GET["next"])
@@ -129,21 +162,204 @@ def logout(request):
     return HttpResponseRedirect(reverse("applications:home"))
 
 
+APPLICATIONS_PAGE_SIZE = 50
+TAG_FACETS = 20
+
+# Columns read by applications.html, including those used by Application.__str__.
+APPLICATION_LIST_FIELDS = (
+    "id",
+    "status",
+    "event_count",
+    "last_event_date",
+    "last_activity_at",
+    "position__position_name",
+    "position__company__company_name",
+)
+
+
 @login_required
-def applications(request):
-    try:
-        customer = CustomerProfile.objects.get(user=request.user)
-        applications = Application.objects.filter(applicant=customer).filter(
-            status__in=("Open", "Offer extended")
+@profile_required
+async def applications(request):
+    cursor = request.GET.get("after")
+    tag = request.GET.get("tag")
+
+    async def render_list():
+        applications = (
+            Application.objects.active()
+            .filter(applicant=request.customer)
+            .select_related("position__company")
+            .only(*APPLICATION_LIST_FIELDS)
         )
-        return render(
+        if tag:
+            applications = applications.filter(position__tags__name=tag)
+        paginator = KeysetPaginator(
+            applications, ("last_activity_at", "id"), APPLICATIONS_PAGE_SIZE
+        )
+        tag_counts = (
+            TagCount.objects.filter(applicant=request.customer, count__gt=0)
+            .select_related("tag")
+            .order_by("-count", "tag__name")[:TAG_FACETS]
+        )
+        (applications, next_cursor), tag_counts = await asyncio.gather(
+            paginator.apage(cursor), alist(tag_counts)
+        )
+        return render_to_string(
+            "applications/applications_list.html",
+            {
+                "applications_list": applications,
+                "next_cursor": next_cursor,
+                "tag": tag,
+                "tag_counts": tag_counts,
+            },
             request,
-            "applications/applications.html",
-            {"applications_list": applications},
         )
 
-    except CustomerProfile.DoesNotExist:
-        return HttpResponseRedirect(reverse("applications:create_profile"))
+    try:
+        fragment = await cache.acached_fragment(
+            request.user.pk, "applications", render_list, cursor, tag
+        )
+    except ValueError:
+        return HttpResponseRedirect(reverse("applications:applications"))
+
+    return render(
+        request,
+        "applications/applications.html",
+        {"applications_fragment": fragment, "bulk_form": BulkApplicationsForm()},
+    )
+
+
+@require_POST
+@login_required
+@profile_required
+def bulk_applications(request):
+    form = BulkApplicationsForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Select applications and a valid action.")
+        return HttpResponseRedirect(reverse("applications:applications"))
+
+    data = form.cleaned_data
+    applications = Application.objects.filter(
+        applicant=request.customer, pk__in=data["applications"]
+    )
+    if data["action"] == "status":
+        try:
+            count = applications.transition(data["status"])
+            messages.success(request, "Updated {} applications.".format(count))
+        except InvalidTransition as e:
+            messages.error(request, str(e))
+    elif data["action"] == "event":
+        count = applications.add_event(data["description"], data["date"])
+        messages.success(request, "Added {} events.".format(count))
+    else:
+        count = applications.bulk_delete()
+        messages.success(request, "Deleted {} applications.".format(count))
+    return HttpResponseRedirect(reverse("applications:applications"))
+
+
+@login_required
+@profile_required
+def search(request):
+    query = request.GET.get("q", "")
+    return render(
+        request,
+        "applications/search.html",
+        {"query": query, "results": search_documents(request.customer, query)},
+    )
+
+
+@login_required
+@profile_required
+def stats(request):
+    try:
+        stats = ApplicationStats.objects.get(applicant=request.customer)
+    except ApplicationStats.DoesNotExist:
+        # Customers without a rollup yet, e.g. before refresh_stats has run.
+        ApplicationStats.objects.refresh([request.customer.pk])
+        stats = ApplicationStats.objects.get(applicant=request.customer)
+    return render(request, "applications/stats.html", {"stats": stats})
+
+
+@staff_member_required
+def fragment_cache_stats(request):
+    return JsonResponse(cache.stats())
+
+
+@login_required
+@profile_required
+async def export_applications(request):
+    format = request.GET.get("format", "csv")
+    if format not in exports.FORMATS:
+        return HttpResponse("Unsupported export format.", status=400)
+
+    if isinstance(request, ASGIRequest):
+        content = await exports.aexport_applications(request.customer, format)
+    else:
+        # WSGI servers would buffer an async iterator whole before sending it.
+        content = await sync_to_async(exports.export_applications)(
+            request.customer, format
+        )
+    response = StreamingHttpResponse(content, content_type=exports.FORMATS[format])
+    response["Content-Disposition"] = 'attachment; filename="applications.{}"'.format(
+        format
+    )
+    return response
+
+
+@require_POST
+@login_required
+@profile_required
+def queue_export(request):
+    format = request.POST.get("format", "csv")
+    if format not in exports.FORMATS:
+        return HttpResponse("Unsupported export format.", status=400)
+
+    task = tasks.enqueue(
+        "export_applications",
+        owner=request.customer,
+        profile_id=request.customer.pk,
+        format=format,
+    )
+    return HttpResponseRedirect(
+        reverse("applications:task", kwargs={"task_id": task.pk})
+    )
+
+
+@login_required
+@profile_required
+def task(request, task_id):
+    """Show a task's progress; ?format=json returns it for polling."""
+    task = get_object_or_404(Task, pk=task_id, owner=request.customer)
+    if request.GET.get("format") == "json":
+        return JsonResponse(
+            {
+                "status": task.get_status_display(),
+                "finished": task.finished,
+                "done": task.done,
+                "total": task.total,
+                "result": task.result,
+            }
+        )
+    return render(request, "applications/task.html", {"task": task})
+
+
+@login_required
+@profile_required
+def task_download(request, task_id):
+    task = get_object_or_404(
+        Task,
+        pk=task_id,
+        owner=request.customer,
+        name="export_applications",
+        status=TaskStatus.DONE,
+    )
+    if not tasks.storage().exists(task.result["path"]):
+        raise Http404("The export file no longer exists.")
+    return FileResponse(
+        tasks.storage().open(task.result["path"], "rb"),
+        as_attachment=True,
+        filename="applications.{}".format(task.result["format"]),
+        content_type=exports.FORMATS[task.result["format"]],
+    )
 
 
 class NewApplicationView(FormView):
@@ -166,7 +382,7 @@ class NewApplicationView(FormView):
                     "sub_industry": data["company_sub_industry"],
                 },
             )
-            position, __ = Position.objects.get_or_create(
+            position, created = Position.objects.get_or_create(
                 company=company,
                 position_name=data["position_name"],
                 defaults={
@@ -176,8 +392,14 @@ class NewApplicationView(FormView):
                     "tech_stack": data["tech_stack"],
                 },
             )
+            if created:
+                position.tags.set(
+                    Tag.objects.for_names(
+                        parse_tags(data.get("tags") or data["tech_stack"])
+                    )
+                )
             application, created = Application.objects.get_or_create(
-                applicant=request.user.customerprofile, position=position
+                applicant=request.customer, position=position
             )
             if not created:
                 messages.error(request, "This application already exists.")
@@ -192,23 +414,127 @@ class NewApplicationView(FormView):
             return render(request, self.template_name, {"form": form})
 
 
+class ImportApplicationsView(FormView):
+    template_name = "applications/import_applications.html"
+    form_class = ImportApplicationsForm
+    success_url = "/applications"
+
+    def get(self, request):
+        form = self.form_class()
+        return render(request, self.template_name, {"form": form})
+
+    def post(self, request):
+        form = self.form_class(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            task = tasks.enqueue(
+                "import_applications",
+                owner=request.customer,
+                profile_id=request.customer.pk,
+                path=tasks.save_upload(upload),
+                format=guess_format(upload.name),
+            )
+            messages.success(request, "Import queued.")
+            return HttpResponseRedirect(
+                reverse("applications:task", kwargs={"task_id": task.pk})
+            )
+
+        else:
+            messages.error(request, "Please choose a file to import.")
+            return render(request, self.template_name, {"form": form}, status=400)
+
+
+EVENTS_PAGE_SIZE = 50
+
+
 class ApplicationDetailView(DetailView):
     template_name = "applications/application_details.html"
     model = Application
 
-    def get_context_data(self, **kwargs):
-        context = super(ApplicationDetailView, self).get_context_data(**kwargs)
-        context["application"] = application
-        return context
+    async def get(self, request, *args, **kwargs):
+        application_id = self.kwargs.get("application_id")
+        cursor = request.GET.get("events_after")
+        try:
+            fragment = await cache.acached_fragment(
+                request.user.pk,
+                "application",
+                lambda: self.render_application(request, application_id, cursor),
+                application_id,
+                cursor,
+            )
+        except PermissionDenied:
+            return HttpResponseRedirect(reverse("applications:applications"))
+        except ValueError:
+            return HttpResponseRedirect(
+                reverse(
+                    "applications:application",
+                    kwargs={"application_id": application_id},
+                )
+            )
 
-    def get(self, request, *args, **kwargs):
-        application = get_object_or_404(
-            Application, pk=self.kwargs.get("application_id")
+        return render(
+            request,
+            self.template_name,
+            {
+                "application_id": application_id,
+                "application_fragment": fragment,
+                "status_form": ApplicationStatusForm(),
+            },
         )
-        if application.applicant.user.id != request.user.id:
-            return HttpResponseRedirect(reverse("applications:applications"))
 
-        return render(request, self.template_name, {"application": application})
+    async def render_application(self, request, application_id, cursor):
+        paginator = KeysetPaginator(
+            Event.objects.filter(application_id=application_id),
+            ("date", "id"),
+            EVENTS_PAGE_SIZE,
+        )
+        # The events are only shown if the application is the customer's, but
+        # can be read at the same time.
+        try:
+            application, (events, next_cursor) = await asyncio.gather(
+                Application.objects.select_related("position__company").aget(
+                    pk=application_id, applicant=request.customer
+                ),
+                paginator.apage(cursor),
+            )
+        except Application.DoesNotExist:
+            if await Application.objects.filter(pk=application_id).aexists():
+                raise PermissionDenied
+            raise Http404("No application matches the given query.")
+
+        return render_to_string(
+            "applications/application_summary.html",
+            {
+                "application": application,
+                "events": events,
+                "next_events_cursor": next_cursor,
+            },
+            request,
+        )
+
+
+class ApplicationStatusView(FormView):
+    form_class = ApplicationStatusForm
+
+    def post(self, request, *args, **kwargs):
+        application_id = self.kwargs.get("application_id")
+        application = get_object_or_404(
+            Application, pk=application_id, applicant=request.customer
+        )
+        form = self.form_class(request.POST)
+        if form.is_valid():
+            try:
+                application.transition(form.cleaned_data["status"])
+                messages.success(request, "Status updated.")
+            except InvalidTransition as e:
+                messages.error(request, str(e))
+        else:
+            messages.error(request, "Invalid status.")
+        return HttpResponseRedirect(
+            reverse(
+                "applications:application", kwargs={"application_id": application_id}
+            )
+        )
 
 
 class EventsView(FormView):
@@ -220,45 +546,49 @@ class EventsView(FormView):
         context["application_id"] = self.kwargs["application_id"]
         return context
 
-    def get(self, request):
-        form = self.form_class()
-        return render(request, self.template_name, {"form": form})
+    def get(self, request, *args, **kwargs):
+        return render(request, self.template_name, self.get_context_data())
 
-    def post(self, request):
+    def post(self, request, *args, **kwargs):
         form = self.form_class(request.POST)
         if form.is_valid():
             application_id = self.kwargs.get("application_id")
-            application = get_object_or_404(Application, application_id)
-            if application.applicant.user.id == request.user.id:
-                event = Event.objects.create(
+            application = get_object_or_404(
+                Application, pk=application_id, applicant=request.customer
+            )
+            # The receivers update the application's event counters in the
+            # same transaction.
+            with transaction.atomic():
+                Event.objects.create(
                     application=application,
                     description=form.cleaned_data["description"],
                     date=form.cleaned_data["date"],
                 )
-                event.save()
-                messages.success(request, "New event added.")
-                return HttpResponseRedirect(
-                    reverse(
-                        "applications:application",
-                        kwargs={"application_id": application_id},
-                    )
+            messages.success(request, "New event added.")
+            return HttpResponseRedirect(
+                reverse(
+                    "applications:application",
+                    kwargs={"application_id": application_id},
                 )
+            )
 
         else:
             messages.error(request, "Invalid data entered.")
-            return render(request, self.template_name, {"form": form})
+            return render(request, self.template_name, self.get_context_data(form=form))
 
 
 class EventByIdView(TemplateView):
 
     def delete(self, request, *args, **kwargs):
-        event_id = self.kwargs.get("event_id")
-        event = get_object_or_404(Event, pk=event_id)
-        if event.application.applicant.user.id == request.user.id:
-            event.delete()
-            messages.success(request, "Event deleted.")
-        else:
-            messages.error(request, "Cannot delete this event.")
+        event = get_object_or_404(
+            Event,
+            pk=self.kwargs.get("event_id"),
+            application__applicant=request.customer,
+        )
+        # delete() sends post_delete, which updates the counters, inside its
+        # own transaction.
+        event.delete()
+        messages.success(request, "Event deleted.")
         return HttpResponseRedirect(
             reverse(
                 "applications:application",
@@ -277,9 +607,9 @@ class ProfileView(FormView):
         initial["first_name"] = self.request.user.first_name
         initial["last_name"] = self.request.user.last_name
         initial["email"] = self.request.user.email
-        initial["bio"] = self.request.user.customerprofile.bio
-        initial["birth_date"] = self.request.user.customerprofile.birth_date
-        initial["location"] = self.request.user.customerprofile.location
+        initial["bio"] = self.request.customer.bio
+        initial["birth_date"] = self.request.customer.birth_date
+        initial["location"] = self.request.customer.location
         return initial
 
     def get(self, request):
@@ -289,41 +619,49 @@ class ProfileView(FormView):
     def post(self, request):
         form = self.form_class(request.POST)
         if form.is_valid():
-            # Update keys for User model.
-            user_keys = ("first_name", "last_name", "email")
-            for k in user_keys:
-                value = form.cleaned_data.get(k)
-                if value:
-                    setattr(request.user, k, value)
-
-            # Update keys for CustomerProfile model.
-            profile_keys = ("bio", "birth_date", "location")
-            for k in profile_keys:
-                value = form.cleaned_data.get(k)
-                if value:
-                    setattr(request.user.customerprofile, k, value)
-
-            # Attempt to update password.
-            password_keys = ("password", "confirm_password")
-            password_values = (password, confirm_password) = [
-                form.cleaned_data.get(k) for k in password_keys
-            ]
-            if request.user.check_password(password):
-                messages.error(request, "This is your current password.")
-                return render(request, self.template_name, {"form": form})
+            # Hash only when a new password was entered: every hash costs as
+            # much CPU as the rest of the request.
+            password = form.cleaned_data.get("password")
+            password_changed = False
+            if password:
+                if request.user.check_password(password):
+                    messages.error(request, "This is your current password.")
+                    return render(request, self.template_name, {"form": form})
 
-            elif all(password_values):
                 try:
                     validate_password(password)
                     request.user.set_password(password)
+                    password_changed = True
                 except ValidationError:
                     messages.error(request, "This password isn't strong enough.")
 
-            request.user.save()
-            request.user.customerprofile.save()
+            user_fields = assign_changed(
+                request.user, form.cleaned_data, ("first_name", "last_name", "email")
+            )
+            if password_changed:
+                user_fields.append("password")
+            if user_fields:
+                request.user.save(update_fields=user_fields)
+            if password_changed:
+                # Keep this session logged in with the new password.
+                update_session_auth_hash(request, request.user)
+
+            profile_fields = assign_changed(
+                request.customer, form.cleaned_data, ("bio", "birth_date", "location")
+            )
+            if profile_fields:
+                request.customer.save(update_fields=profile_fields)
             messages.success(request, "Profile updated successfully.")
             return render(request, self.template_name, {"form": form})
 
         else:  # check form.errors for mismatched_passwords
             messages.error(request, "Passwords do not match.")
         return render(request, self.template_name, {"form": form})
+
+
+def assign_changed(obj, data, keys):
+    """Set the given non-empty values that differ on `obj`; return their keys."""
+    changed = [key for key in keys if data.get(key) and data[key] != getattr(obj, key)]
+    for key in changed:
+        setattr(obj, key, data[key])
+    return changed
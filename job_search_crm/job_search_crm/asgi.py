@@ -0,0 +1,20 @@
+"""
+ASGI config for job_search_crm project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "job_search_crm.settings")
+# Async views run their queries in a pool of threads, each holding its own
+# connection, which persistent connections would leave open after the threads
+# are done. Use a pooler such as PgBouncer to reuse connections instead.
+os.environ.setdefault("DATABASE_CONN_MAX_AGE", "0")
+
+application = get_asgi_application()
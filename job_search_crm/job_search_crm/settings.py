@@ -31,7 +31,9 @@ APPEND_SLASH = True
 
 LOGIN_URL = "/"
 
-MESSAGE_STORAGE = "django.contrib.messages.storage.session.SessionStorage"
+# Messages travel in a cookie, falling back to the session only when they
+# don't fit.
+MESSAGE_STORAGE = "django.contrib.messages.storage.fallback.FallbackStorage"
 
 
 # Application definition
@@ -47,45 +49,214 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "applications.middleware.InstrumentationMiddleware",
+    "applications.middleware.ReplicaPinMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "applications.middleware.CustomerProfileMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Record per-view query counts and timings; see the instrumentation_report
+# command.
+INSTRUMENT_REQUESTS = False
+
 ROOT_URLCONF = "job_search_crm.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "applications.instrumentation.InstrumentedDjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
-            ]
+            ],
+            # Templates are compiled once per process. runserver still picks up
+            # edits: it clears the cache when a template file changes.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                )
+            ],
         },
     }
 ]
 
 WSGI_APPLICATION = "job_search_crm.wsgi.application"
+ASGI_APPLICATION = "job_search_crm.asgi.application"
 
 
 # Database
 # https://docs.djangoproject.com/en/2.0/ref/settings/#databases
+# SQLite by default. Set DATABASE_ENGINE=postgresql and the DATABASE_NAME,
+# DATABASE_USER, DATABASE_PASSWORD, DATABASE_HOST and DATABASE_PORT variables
+# to use PostgreSQL, and DATABASE_POOLER=1 when connecting through a
+# transaction-pooling pooler such as PgBouncer.
+
+DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", "sqlite3")
+
+if DATABASE_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DATABASE_NAME", "job_search_crm"),
+            "USER": os.environ.get("DATABASE_USER", ""),
+            "PASSWORD": os.environ.get("DATABASE_PASSWORD", ""),
+            "HOST": os.environ.get("DATABASE_HOST", ""),
+            "PORT": os.environ.get("DATABASE_PORT", ""),
+            # Server-side cursors don't survive the pooler handing the next
+            # transaction to another server connection.
+            "DISABLE_SERVER_SIDE_CURSORS": os.environ.get("DATABASE_POOLER") == "1",
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get(
+                "DATABASE_NAME", os.path.join(BASE_DIR, "db.sqlite3")
+            ),
+            "OPTIONS": {
+                # Take the write lock when a transaction starts, so two writers
+                # wait on busy_timeout instead of failing with "database is
+                # locked" when both try to upgrade a read lock.
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    }
 
-DATABASES = {
+# Keep connections open between requests, checking them before reuse; asgi.py
+# turns this off by default.
+DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("DATABASE_CONN_MAX_AGE", 60))
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Read replicas of the primary: a comma-separated DATABASE_REPLICAS list of
+# hosts for PostgreSQL, or of database files for SQLite. Reads of the
+# applications app are spread over them by PrimaryReplicaRouter.
+REPLICA_DATABASES = []
+REPLICA_KEY = "HOST" if DATABASE_ENGINE == "postgresql" else "NAME"
+for replica in filter(None, os.environ.get("DATABASE_REPLICAS", "").split(",")):
+    alias = "replica{}".format(len(REPLICA_DATABASES))
+    DATABASES[alias] = dict(
+        DATABASES["default"], **{REPLICA_KEY: replica}, TEST={"MIRROR": "default"}
+    )
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["applications.routers.PrimaryReplicaRouter"]
+
+# Seconds a user's reads stay on the primary after they write, which should
+# exceed the replication lag.
+REPLICA_PIN_SECONDS = 10
+
+# Applied to every new SQLite connection by applications.db. WAL lets reads
+# run alongside the single writer; synchronous=NORMAL is durable in WAL mode
+# except against power loss; busy_timeout is in milliseconds.
+SQLITE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.0/topics/cache/
+# Kept in files under CACHE_DIR, shared by every web process and run_worker:
+# with a cache per process, fragments dropped by a background import or by
+# another worker would still be served. Use Redis or Memcached when serving
+# from several hosts.
+
+CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(BASE_DIR, "cache"))
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
-    }
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(CACHE_DIR, "default"),
+        # Room for the fragments of every active user; the default is 300.
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    # Kept apart so that clearing the fragment cache logs nobody out. Shared
+    # like the default cache, so a session ended by one process isn't still
+    # found by the others.
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "SESSION_CACHE_LOCATION", os.path.join(CACHE_DIR, "sessions")
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# Moves the caches to a temporary directory while the tests run.
+TEST_RUNNER = "applications.runner.TestRunner"
+
+# Seconds a rendered per-user page fragment is kept.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+
+# Background tasks
+# Run by `manage.py run_worker`. Uploads waiting to be imported and finished
+# exports are kept in TASK_FILES_DIR.
+
+TASK_FILES_DIR = os.environ.get("TASK_FILES_DIR", os.path.join(BASE_DIR, "task_files"))
+# Seconds before a failed task is retried, doubling after every attempt.
+TASK_RETRY_BACKOFF = 30
+# Seconds a running task may go without reporting progress before it's
+# considered lost and run again.
+TASK_LEASE_SECONDS = 10 * 60
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+# SESSION_STORE picks where sessions are kept: "cached_db" reads them from
+# the sessions cache and writes them through to the database, "cache" keeps
+# them in the cache only, so they are lost with it, and "db" reads the
+# database on every request. Expired sessions in the database are deleted by
+# the clearsessions command, which should run daily.
+
+SESSION_STORE = os.environ.get("SESSION_STORE", "cached_db")
+SESSION_ENGINE = "django.contrib.sessions.backends.{}".format(SESSION_STORE)
+SESSION_CACHE_ALIAS = "sessions"
+
+
+# Authentication
+# https://docs.djangoproject.com/en/2.0/topics/auth/customizing/
+
+# ModelBackend stays listed so sessions created before the switch stay valid.
+AUTHENTICATION_BACKENDS = [
+    "applications.backends.CustomerProfileBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# PASSWORD_HASHER picks the hasher of new passwords: "scrypt", "argon2"
+# (needs argon2-cffi), "pbkdf2", or "fast" for tests and benchmarks only.
+# PASSWORD_HASHER_COST sets its cost (see the calibrate_password_hasher
+# command). Passwords stored by the other hashers or with another cost are
+# rehashed when their users log in.
+
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "scrypt")
+PASSWORD_HASHER_COST = os.environ.get("PASSWORD_HASHER_COST")
+
+PASSWORD_HASHER_TIERS = {
+    "scrypt": "applications.hashers.ScryptPasswordHasher",
+    "argon2": "applications.hashers.Argon2PasswordHasher",
+    "pbkdf2": "applications.hashers.PBKDF2PasswordHasher",
+    "fast": "django.contrib.auth.hashers.MD5PasswordHasher",
 }
+PASSWORD_HASHERS = [PASSWORD_HASHER_TIERS[PASSWORD_HASHER]] + [
+    path
+    for tier, path in PASSWORD_HASHER_TIERS.items()
+    if tier not in (PASSWORD_HASHER, "fast")
+]
 
 
 # Password validation